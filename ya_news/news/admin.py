@@ -1,15 +1,165 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.forms.models import BaseInlineFormSet
 
 from .models import Comment, News
+from .pagination import EstimatedCountPaginator
 
+# Параметр адреса с номером страницы комментариев на странице новости.
+COMMENTS_PAGE_VAR = 'comments_page'
 
-class CommentInline(admin.StackedInline):
+
+def shift_comment_count(news_id, delta):
+    """
+    Сдвигает счётчик комментариев новости на delta.
+
+    Сайт меняет счётчик вместе с записью комментария, в админке это
+    делают её методы сохранения и удаления. В минус счётчик не уходит:
+    он мог разойтись с реальностью до исправления этих методов.
+    """
+    if delta:
+        News.objects.filter(pk=news_id).update(
+            comment_count=Greatest(F('comment_count') + delta, 0)
+        )
+
+
+class EstimatedCountChangeList(ChangeList):
+    """
+    Список, число строк которого оценено EstimatedCountPaginator.
+
+    Если оценка завышена и запрошенная страница оказалась за концом
+    списка, строки считаются честно и показывается настоящая последняя
+    страница вместо пустой.
+    """
+
+    def get_results(self, request):
+        super().get_results(request)
+        paginator = self.paginator
+        if (
+            not paginator.estimated
+            or not self.multi_page
+            or self.show_all and self.can_show_all
+            or self.page_num == 1
+            or self.result_list
+        ):
+            return
+        paginator.count_exactly()
+        self.page_num = paginator.num_pages
+        self.result_count = paginator.count
+        self.can_show_all = self.result_count <= self.list_max_show_all
+        self.multi_page = self.result_count > self.list_per_page
+        if self.multi_page:
+            self.result_list = paginator.page(self.page_num).object_list
+        else:
+            self.result_list = self.queryset._clone()
+
+
+class EstimatedCountAdmin(admin.ModelAdmin):
+    """
+    Список без COUNT(*) по всей таблице: число строк примерное, пока
+    не понадобится точное.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return EstimatedCountChangeList
+
+
+class CommentPageFormSet(BaseInlineFormSet):
+    """Формы только для одной страницы комментариев новости."""
+    per_page = 20
+    page_number = None
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            # pk в сортировке: у комментариев одной секунды порядок
+            # должен быть одним и тем же на каждой странице.
+            queryset = super().get_queryset().order_by('created', 'pk')
+            paginator = Paginator(queryset, self.per_page)
+            self.page = paginator.get_page(self.page_number)
+            self._queryset = self.page.object_list
+        return self._queryset
+
+
+class CommentInline(admin.TabularInline):
+    """
+    Комментарии на странице новости, по страницам.
+
+    У вирусной новости десятки тысяч комментариев, и без страниц админка
+    рисовала форму для каждого. Автор выбирается поиском, а не списком
+    из всех пользователей.
+    """
     model = Comment
+    formset = CommentPageFormSet
+    template = 'admin/news/comment_inline.html'
+    fields = ('author', 'text', 'created')
+    readonly_fields = ('created',)
+    autocomplete_fields = ('author',)
     extra = 0
 
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.page_number = request.GET.get(COMMENTS_PAGE_VAR)
+        return formset
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('author')
+
 
 @admin.register(News)
-class NewsAdmin(admin.ModelAdmin):
+class NewsAdmin(EstimatedCountAdmin):
+    list_display = ('title', 'date', 'comment_count')
     inlines = [
         CommentInline,
     ]
+
+    def save_formset(self, request, form, formset, change):
+        super().save_formset(request, form, formset, change)
+        if formset.model is Comment:
+            shift_comment_count(
+                form.instance.pk,
+                len(formset.new_objects) - len(formset.deleted_objects),
+            )
+
+
+@admin.register(Comment)
+class CommentAdmin(EstimatedCountAdmin):
+    """
+    Все комментарии. Точный поиск по автору идёт по индексу, список
+    комментариев одной новости — по ссылке со страницы новости.
+    """
+    list_display = ('__str__', 'news', 'author', 'created')
+    list_select_related = ('news', 'author')
+    # По первичному ключу: для сортировки по created индекса нет.
+    ordering = ('-pk',)
+    search_fields = ('=author__username',)
+    raw_id_fields = ('news',)
+    autocomplete_fields = ('author',)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change:
+            shift_comment_count(obj.news_id, 1)
+        elif 'news' in form.changed_data:
+            shift_comment_count(form.initial['news'], -1)
+            shift_comment_count(obj.news_id, 1)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        shift_comment_count(obj.news_id, -1)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            counts = list(
+                queryset.order_by()
+                .values_list('news_id')
+                .annotate(count=Count('pk'))
+            )
+            super().delete_queryset(request, queryset)
+            for news_id, count in counts:
+                shift_comment_count(news_id, -count)
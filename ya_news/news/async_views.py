@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.views import generic
+
+from .cache import HOME_CHANGED_KEY, home_cache, home_cache_key
+from .forms import CommentForm
+from .live import event_stream
+from .models import News
+from .replica import primary_reads_since
+from .views import (
+    NewsComment, aget_page, make_news_etag, news_validators
+)
+
+
+class AsyncNewsList(generic.View):
+    """
+    Асинхронная главная страница для запуска под ASGI.
+
+    Повторяет NewsList, но ходит в базу через асинхронный ORM и не
+    занимает поток на время запроса.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        key = home_cache_key(request)
+        content = await home_cache().aget(key)
+        if content is not None:
+            return HttpResponse(content)
+        with primary_reads_since(await cache.aget(HOME_CHANGED_KEY)):
+            page = await aget_page(
+                News.objects.all(),
+                ('-date', '-pk'),
+                settings.NEWS_COUNT_ON_HOME_PAGE,
+                request.GET.get('cursor'),
+            )
+        response = render(request, 'news/home.html', {
+            'object_list': page.object_list,
+            'page_obj': page,
+        })
+        await home_cache().aset(
+            key, response.content, settings.NEWS_HOME_CACHE_TIMEOUT
+        )
+        return response
+
+
+class AsyncNewsDetail(generic.View):
+    """
+    Асинхронная страница новости.
+
+    Комментарии по-прежнему принимает синхронный NewsComment: запись
+    идёт в транзакции, а асинхронных транзакций в Django нет.
+    """
+
+    async def get(self, request, pk):
+        request.user = await request.auser()
+        etag = make_news_etag(
+            request, pk, await news_validators(pk).afirst()
+        )
+        if etag is None:
+            raise Http404('Новость не найдена.')
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return response
+        try:
+            news = await News.objects.aget(pk=pk)
+        except News.DoesNotExist:
+            raise Http404('Новость не найдена.')
+        comment_page = await aget_page(
+            news.comment_set.select_related('author'),
+            ('created', 'pk'),
+            settings.NEWS_COMMENTS_PER_PAGE,
+            request.GET.get('cursor'),
+        )
+        context = {
+            'news': news,
+            'object': news,
+            'comment_page': comment_page,
+        }
+        if not comment_page.has_next:
+            # Новые комментарии дописываются в конец последней страницы.
+            context['live_url'] = reverse('news:live', args=(pk,))
+        if request.user.is_authenticated:
+            context['form'] = CommentForm()
+        response = render(request, 'news/detail.html', context)
+        response.headers['ETag'] = etag
+        return response
+
+    async def post(self, request, *args, **kwargs):
+        view = sync_to_async(NewsComment.as_view())
+        return await view(request, *args, **kwargs)
+
+
+class NewsLiveComments(generic.View):
+    """
+    Новые комментарии к новости в формате Server-Sent Events.
+
+    Только под ASGI: ждущий клиент занимает корутину, а под WSGI он
+    занимал бы поток сервера до самого отключения.
+    """
+
+    async def get(self, request, pk):
+        if not isinstance(request, ASGIRequest):
+            return HttpResponse(
+                'Поток событий доступен только под ASGI.',
+                status=HTTPStatus.NOT_IMPLEMENTED,
+            )
+        if not await News.objects.filter(pk=pk).aexists():
+            raise Http404('Новость не найдена.')
+        last_id = request.headers.get('Last-Event-ID', '')
+        response = StreamingHttpResponse(
+            event_stream(pk, int(last_id) if last_id.isdigit() else None),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Иначе nginx копит события в буфере.
+        response['X-Accel-Buffering'] = 'no'
+        return response
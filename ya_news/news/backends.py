@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .cache import get_cached_user
+
+UserModel = get_user_model()
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который берёт пользователя запроса из кэша.
+
+    AuthenticationMiddleware загружает пользователя на каждом запросе,
+    здесь SELECT к auth_user выполняется только при промахе. Запись
+    сбрасывается сигналами при сохранении и удалении пользователя,
+    поэтому смена пароля или блокировка действуют сразу. Изменения
+    через QuerySet.update() сигналов не отправляют.
+    """
+
+    def get_user(self, user_id):
+        user = get_cached_user(user_id, lambda: self.load_user(user_id))
+        if user is not None and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def load_user(self, user_id):
+        try:
+            return UserModel._default_manager.get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
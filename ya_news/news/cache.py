@@ -0,0 +1,106 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils import translation
+
+# Страницы главной лежат в своём кэше, версия и время сброса — в
+# основном: иначе их вытесняли бы сами страницы.
+HOME_CACHE_ALIAS = 'pages'
+HOME_VERSION_KEY = 'news:home:version'
+# Когда главную сбросили в последний раз, по time.time().
+HOME_CHANGED_KEY = 'news:home:changed'
+
+
+def get_version(key):
+    """Текущее значение счётчика версии key."""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def get_home_version():
+    """Текущая версия кэша главной страницы."""
+    return get_version(HOME_VERSION_KEY)
+
+
+def invalidate_home_cache():
+    """
+    Сбрасываем все закэшированные варианты главной страницы.
+
+    Ключи содержат номер версии, поэтому достаточно его увеличить:
+    старые записи больше никогда не будут прочитаны и вытеснятся сами.
+    """
+    cache.set(HOME_CHANGED_KEY, time.time(), timeout=None)
+    bump_version(HOME_VERSION_KEY)
+
+
+def news_version_key(news_id):
+    return f'news:{news_id}:version'
+
+
+def get_news_version(news_id):
+    """
+    Версия страницы новости: меняется при правке самой новости и её
+    комментариев, но не соседних новостей.
+    """
+    return get_version(news_version_key(news_id))
+
+
+def bump_news_version(news_id):
+    bump_version(news_version_key(news_id))
+
+
+def home_cache():
+    return caches[HOME_CACHE_ALIAS]
+
+
+def home_cache_key(request):
+    """
+    Ключ кэша главной страницы.
+
+    Учитываем язык, состояние авторизации и курсор страницы. В шапке
+    выводится имя пользователя, поэтому для авторизованных в ключ
+    попадает его id.
+    """
+    user = request.user
+    auth_state = f'user-{user.pk}' if user.is_authenticated else 'anon'
+    return 'news:home:{version}:{language}:{auth_state}:{cursor}'.format(
+        version=get_home_version(),
+        language=translation.get_language(),
+        auth_state=auth_state,
+        cursor=request.GET.get('cursor', ''),
+    )
+
+
+def user_cache_key(user_id):
+    # id из сессии приходит строкой, из сигнала — числом.
+    return f'news:user:{user_id}'
+
+
+def get_cached_user(user_id, load):
+    """
+    Пользователь по id из кэша или результат load(), если его там нет.
+
+    None (пользователь удалён) не кэшируется.
+    """
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = load()
+        if user is not None:
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_user_cache(user_id):
+    cache.delete(user_cache_key(user_id))
@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def fragment_cache(request):
+    """Срок жизни фрагментов, которые шаблоны кэшируют тегом cache."""
+    return {'fragment_timeout': settings.NEWS_FRAGMENT_CACHE_TIMEOUT}
@@ -0,0 +1,92 @@
+import csv
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Comment, News
+
+
+class Export:
+    """Выгрузка строк модели: поля и поле даты для фильтра по периоду."""
+
+    def __init__(self, model, fields, date_field):
+        self.model = model
+        self.fields = fields
+        self.date_field = date_field
+
+    def rows(self, chunk_size, date_from=None, date_to=None):
+        """
+        Кортежи значений fields в порядке первичного ключа.
+
+        values_list() с iterator() не создаёт объектов моделей и читает
+        строки из базы пачками по chunk_size.
+        """
+        lookups = {}
+        if date_from is not None:
+            lookups[f'{self.date_field}__gte'] = self.bound(date_from)
+        if date_to is not None:
+            lookups[f'{self.date_field}__lt'] = self.bound(date_to, end=True)
+        return (
+            self.model.objects.filter(**lookups)
+            .order_by('pk')
+            .values_list(*self.fields)
+            .iterator(chunk_size=chunk_size)
+        )
+
+    def bound(self, day, end=False):
+        """
+        Граница периода для поля даты, конец берётся включительно.
+
+        Для DateTimeField день переводится в начало суток в текущем часовом
+        поясе, чтобы сравнение шло по значению поля, а не через __date.
+        """
+        if end:
+            day += timedelta(days=1)
+        field = self.model._meta.get_field(self.date_field)
+        if field.get_internal_type() == 'DateTimeField':
+            return timezone.make_aware(datetime.combine(day, time.min))
+        return day
+
+
+EXPORTS = {
+    'news': Export(
+        News, ('id', 'title', 'text', 'date', 'comment_count'), 'date'
+    ),
+    'comments': Export(
+        Comment, ('id', 'news_id', 'author_id', 'text', 'created'), 'created'
+    ),
+}
+
+
+class Echo:
+    """Файл для csv.writer, который возвращает строку, а не пишет её."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(fields, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(fields, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', csv_lines),
+    'ndjson': ('application/x-ndjson; charset=utf-8', ndjson_lines),
+}
+
+
+def export_lines(kind, format, chunk_size, date_from=None, date_to=None):
+    """Строки выгрузки kind ('news', 'comments') в формате format."""
+    export = EXPORTS[kind]
+    lines = FORMATS[format][1]
+    return lines(export.fields, export.rows(chunk_size, date_from, date_to))
@@ -1,7 +1,10 @@
-from django.forms import ModelForm
+from django.forms import (
+    CharField, DateField, DateInput, Form, ModelForm
+)
 from django.core.exceptions import ValidationError
 
 from .models import Comment
+from .profanity import BadWordsFilter
 
 BAD_WORDS = (
     'редиска',
@@ -10,6 +13,8 @@ BAD_WORDS = (
 )
 WARNING = 'Не ругайтесь!'
 
+bad_words = BadWordsFilter(BAD_WORDS)
+
 
 class CommentForm(ModelForm):
 
@@ -20,8 +25,32 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        if bad_words.contains(text):
+            raise ValidationError(WARNING)
         return text
+
+
+class DateRangeForm(Form):
+    date_from = DateField(
+        label='С даты',
+        required=False,
+        widget=DateInput(attrs={'type': 'date'}),
+    )
+    date_to = DateField(
+        label='По дату',
+        required=False,
+        widget=DateInput(attrs={'type': 'date'}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise ValidationError('Начало периода позже его конца.')
+        return cleaned_data
+
+
+class SearchForm(DateRangeForm):
+    q = CharField(label='Запрос', max_length=200)
+    field_order = ('q',)
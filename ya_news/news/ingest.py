@@ -0,0 +1,162 @@
+import queue
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent import futures
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.db.models.signals import post_save
+
+from .models import Comment, News
+
+# Сигнал потоку-писателю завершиться.
+STOP = object()
+
+
+class CommentQueue:
+    """
+    Очередь записи комментариев: много INSERT в одной транзакции.
+
+    SQLite пропускает одного писателя за раз, и сотни отдельных
+    транзакций выстраиваются в очередь за блокировкой. Здесь комментарии
+    из всех запросов собирает один поток-писатель и сохраняет пачкой,
+    как только набралось NEWS_COMMENT_BATCH_SIZE штук или прошло
+    NEWS_COMMENT_BATCH_WAIT секунд с первого. Запрос ждёт, пока его
+    пачка не зафиксирована, поэтому ответ по-прежнему означает, что
+    комментарий записан.
+    """
+
+    def __init__(self):
+        self._items = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._writer = None
+
+    def submit(self, comment, timeout):
+        """
+        Сохраняет comment в ближайшей пачке и возвращает его с pk.
+
+        Если новости уже нет, поднимается News.DoesNotExist, ошибки
+        записи пачки поднимаются здесь же. Если пачка не записана за
+        timeout секунд, поднимается futures.TimeoutError и комментарий
+        снимается с очереди; пачка, которую уже начали писать, его всё же
+        сохранит.
+        """
+        future = futures.Future()
+        # База выбирается в потоке запроса: так роутер знает о записи.
+        using = router.db_for_write(Comment, instance=comment)
+        self._start()
+        self._items.put((comment, using, future))
+        try:
+            return future.result(timeout)
+        except futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self):
+        """Дописывает принятые комментарии и останавливает писателя."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._items.put(STOP)
+            writer.join()
+
+    def _start(self):
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._run, name='comment-writer', daemon=True
+                )
+                self._writer.start()
+
+    def _run(self):
+        try:
+            running = True
+            while running:
+                batch, running = self._collect()
+                self._flush(batch)
+        finally:
+            connections.close_all()
+
+    def _collect(self):
+        """Ждёт первый комментарий и добирает пачку до лимита или срока."""
+        item = self._items.get()
+        if item is STOP:
+            return [], False
+        batch = [item]
+        deadline = time.monotonic() + settings.NEWS_COMMENT_BATCH_WAIT
+        while len(batch) < settings.NEWS_COMMENT_BATCH_SIZE:
+            try:
+                item = self._items.get(
+                    timeout=max(0, deadline - time.monotonic())
+                )
+            except queue.Empty:
+                break
+            if item is STOP:
+                return batch, False
+            batch.append(item)
+        return batch, True
+
+    def _flush(self, batch):
+        by_database = defaultdict(list)
+        for item in batch:
+            # Запрос, который перестал ждать, отменил свой комментарий.
+            if not item[2].set_running_or_notify_cancel():
+                continue
+            by_database[item[1]].append(item)
+        for using, items in by_database.items():
+            try:
+                write_batch(using, items)
+            except Exception:
+                # По одному, чтобы ошибка в одном комментарии не
+                # отменила остальные.
+                for item in items:
+                    try:
+                        write_batch(using, [item])
+                    except Exception as error:
+                        item[2].set_exception(error)
+
+
+def write_batch(using, items):
+    """
+    Сохраняет пачку одной транзакцией и отвечает ожидающим запросам.
+
+    Счётчики увеличиваются одним UPDATE на новость, комментарии
+    записываются одним INSERT. bulk_create() не отправляет post_save,
+    поэтому сигнал отправляется вручную: на нём держатся кэш главной
+    и другие подписчики.
+    """
+    comments = [comment for comment, _, _ in items]
+    with transaction.atomic(using=using):
+        missing = set()
+        counts = Counter(comment.news_id for comment in comments)
+        for news_id, count in counts.items():
+            updated = News.objects.using(using).filter(pk=news_id).update(
+                comment_count=F('comment_count') + count
+            )
+            if not updated:
+                missing.add(news_id)
+        saved = [
+            comment for comment in comments if comment.news_id not in missing
+        ]
+        Comment.objects.using(using).bulk_create(saved)
+        for comment in saved:
+            post_save.send(
+                sender=Comment,
+                instance=comment,
+                created=True,
+                update_fields=None,
+                raw=False,
+                using=using,
+            )
+    for comment, _, future in items:
+        if comment.news_id in missing:
+            future.set_exception(News.DoesNotExist('Новость не найдена.'))
+        else:
+            future.set_result(comment)
+
+
+comment_queue = CommentQueue()
@@ -0,0 +1,186 @@
+import asyncio
+import functools
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+from .models import Comment
+
+logger = logging.getLogger(__name__)
+
+
+def comment_message(pk, author, text, created):
+    """Событие о новом комментарии в том виде, в каком его получит клиент."""
+    return {'id': pk, 'author': author, 'text': text, 'created': created}
+
+
+def format_event(message):
+    """Событие Server-Sent Events; id позволяет клиенту продолжить поток."""
+    data = json.dumps(message, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f'id: {message["id"]}\nevent: comment\ndata: {data}\n\n'
+
+
+class LocalBroker:
+    """
+    Рассылка новых комментариев подписчикам этого процесса.
+
+    Подписчик — это очередь asyncio в цикле событий, который его
+    обслуживает, и больше ничего: тысячи ждущих клиентов занимают по
+    корутине, а не по потоку. publish() вызывается из сигналов в любом
+    потоке и передаёт сообщение в цикл подписчика потокобезопасно.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        self._deliver(channel, message)
+
+    def _deliver(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(put_latest, queue, message)
+            except RuntimeError:
+                # Цикл уже закрыт, подписчик вот-вот отпишется.
+                pass
+
+    def channels(self):
+        with self._lock:
+            return list(self._subscribers)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        """Очередь, в которую приходят сообщения канала, пока открыт блок."""
+        subscriber = (
+            asyncio.get_running_loop(),
+            asyncio.Queue(settings.NEWS_LIVE_QUEUE_SIZE),
+        )
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+
+class DatabaseBroker(LocalBroker):
+    """
+    Рассылка для нескольких процессов: новые комментарии берутся из базы.
+
+    Сигналы видят только записи своего процесса, поэтому здесь каждый
+    процесс раз в NEWS_LIVE_POLL_INTERVAL секунд одним запросом по
+    первичному ключу забирает новые комментарии и раздаёт их своим
+    подписчикам. Опрос идёт, пока есть хотя бы один подписчик.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._poller = None
+
+    def publish(self, channel, message):
+        # Сообщение придёт из базы при следующем опросе.
+        pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        async with super().subscribe(channel) as queue:
+            if self._poller is None or self._poller.done():
+                self._poller = asyncio.create_task(self._poll())
+            yield queue
+
+    async def _poll(self):
+        last = None
+        while self.channels():
+            try:
+                if last is None:
+                    last = await Comment.objects.order_by('-pk').values_list(
+                        'pk', flat=True
+                    ).afirst() or 0
+                else:
+                    rows = Comment.objects.filter(pk__gt=last).order_by('pk')
+                    async for pk, news_id, *fields in rows.values_list(
+                        'pk', 'news_id', 'author__username', 'text', 'created'
+                    ):
+                        self._deliver(news_id, comment_message(pk, *fields))
+                        last = pk
+            except Exception:
+                # Например, база заблокирована. Опрос не останавливается:
+                # следующий продолжит с последнего разосланного комментария.
+                logger.exception('Не удалось получить новые комментарии')
+            await asyncio.sleep(settings.NEWS_LIVE_POLL_INTERVAL)
+
+
+def put_latest(queue, message):
+    """Кладёт сообщение, вытесняя самое старое у медленного клиента."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+@functools.cache
+def get_broker():
+    return import_string(settings.NEWS_LIVE_BROKER)()
+
+
+async def missed_comments(news_id, after):
+    """
+    Комментарии, которые клиент пропустил, пока переподключался.
+
+    Читаются страницами по NEWS_LIVE_QUEUE_SIZE, пока не кончатся:
+    дальше поток идёт из подписки, и всё, что раньше неё, должно
+    прийти отсюда.
+    """
+    size = settings.NEWS_LIVE_QUEUE_SIZE
+    while True:
+        rows = Comment.objects.filter(
+            news_id=news_id, pk__gt=after
+        ).order_by('pk').values_list(
+            'pk', 'author__username', 'text', 'created'
+        )
+        page = [row async for row in rows[:size]]
+        for row in page:
+            yield row
+        if len(page) < size:
+            return
+        after = page[-1][0]
+
+
+async def event_stream(news_id, last_id=None):
+    """
+    Поток событий о новых комментариях к новости.
+
+    Клиент, который переподключился с last_id, сначала получает
+    пропущенное из базы; подписка оформляется до этого, поэтому
+    между ними ничего не теряется, а повторы отбрасываются по id.
+    Пока комментариев нет, раз в NEWS_LIVE_HEARTBEAT секунд уходит
+    комментарий SSE: соединение не закрывают прокси, а сервер узнаёт
+    об отключившемся клиенте и отписывает его.
+    """
+    async with get_broker().subscribe(news_id) as queue:
+        yield 'retry: 5000\n\n'
+        if last_id is not None:
+            async for pk, *fields in missed_comments(news_id, last_id):
+                last_id = pk
+                yield format_event(comment_message(pk, *fields))
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    queue.get(), settings.NEWS_LIVE_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if last_id is None or message['id'] > last_id:
+                yield format_event(message)
@@ -0,0 +1,63 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news.loadtest import percentile
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время открытия страниц админки на текущей базе: '
+        'списков новостей и комментариев и самой обсуждаемой новости.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        news = News.objects.order_by('-comment_count').first()
+        if news is None:
+            raise CommandError('В базе нет новостей, запустите seed_news.')
+        admin, _ = get_user_model().objects.get_or_create(
+            username='benchmark-admin',
+            defaults={'is_staff': True, 'is_superuser': True},
+        )
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(admin)
+        pages = (
+            ('список новостей', reverse('admin:news_news_changelist')),
+            (
+                f'новость, {news.comment_count} комментариев',
+                reverse('admin:news_news_change', args=(news.pk,)),
+            ),
+            ('список комментариев', '/admin/news/comment/'),
+        )
+        self.stdout.write(
+            f'{"страница":<36} {"статус":>6} {"запросов":>9} '
+            f'{"p50, мс":>9} {"КиБ":>8}'
+        )
+        try:
+            for name, url in pages:
+                self.measure(client, name, url, options['repeat'])
+        finally:
+            admin.delete()
+
+    def measure(self, client, name, url, repeat):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append(time.perf_counter() - started)
+        timings.sort()
+        self.stdout.write(
+            f'{name:<36} {response.status_code:>6} {len(queries):>9} '
+            f'{percentile(timings, 50) * 1000:>9.0f} '
+            f'{len(response.content) / 1024:>8.0f}'
+        )
@@ -0,0 +1,109 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.loadtest import percentile
+
+
+async def fetch(host, port, request, slow_delay):
+    """
+    Один запрос медленного клиента.
+
+    Клиент отправляет запрос по частям с паузами и так же по частям
+    читает ответ, удерживая соединение, как это делают мобильные
+    клиенты на плохой сети.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        middle = len(request) // 2
+        writer.write(request[:middle])
+        await writer.drain()
+        await asyncio.sleep(slow_delay)
+        writer.write(request[middle:])
+        await writer.drain()
+        status_line = await reader.readline()
+        while await reader.read(4096):
+            await asyncio.sleep(slow_delay / 10)
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает запущенный ASGI-сервер множеством медленных клиентов и '
+        'выводит число запросов в секунду и задержки. Сравнение '
+        'синхронных и асинхронных view: запустите сервер дважды, '
+        'например NEWS_ASYNC_VIEWS=0 и NEWS_ASYNC_VIEWS=1 '
+        'uvicorn yanews.asgi:application, и прогоните команду на каждом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='например http://127.0.0.1:8000/')
+        parser.add_argument('--clients', type=int, default=200)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument(
+            '--slow-delay',
+            type=float,
+            default=0.2,
+            help='пауза медленного клиента, секунд',
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Нужен адрес вида http://host:port/path')
+        path = url.path or '/'
+        if url.query:
+            path += '?' + url.query
+        request = (
+            f'GET {path} HTTP/1.1\r\n'
+            f'Host: {url.netloc}\r\n'
+            'Connection: close\r\n\r\n'
+        ).encode()
+        latencies, errors, elapsed = asyncio.run(self.run(
+            url.hostname,
+            url.port or 80,
+            request,
+            options['clients'],
+            options['duration'],
+            options['slow_delay'],
+        ))
+        latencies.sort()
+        self.stdout.write(
+            f'запросов: {len(latencies)}, ошибок: {errors}, '
+            f'в секунду: {len(latencies) / elapsed:.1f}'
+        )
+        if latencies:
+            self.stdout.write(
+                f'задержка, мс: '
+                f'p50={percentile(latencies, 50) * 1000:.1f} '
+                f'p99={percentile(latencies, 99) * 1000:.1f} '
+                f'среднее={statistics.mean(latencies) * 1000:.1f}'
+            )
+
+    async def run(self, host, port, request, clients, duration, slow_delay):
+        latencies = []
+        errors = 0
+        started = time.perf_counter()
+        deadline = started + duration
+
+        async def client():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                begin = time.perf_counter()
+                try:
+                    status = await fetch(host, port, request, slow_delay)
+                except OSError:
+                    errors += 1
+                    continue
+                if status >= 500:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - begin)
+
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return latencies, errors, time.perf_counter() - started
@@ -0,0 +1,55 @@
+import random
+import string
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from news.profanity import Matcher
+
+SIZES = (10, 100, 1_000, 10_000, 100_000)
+
+
+def random_word(rng):
+    return ''.join(
+        rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12))
+    )
+
+
+def naive_search(words, text):
+    """Прежний способ: отдельный поиск подстроки для каждого слова."""
+    lowered_text = text.lower()
+    return any(word in lowered_text for word in words)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время проверки комментария наивным перебором и '
+        'автоматом Ахо — Корасик при растущем списке слов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--text-length', type=int, default=2_000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        text = ' '.join(
+            random_word(rng) for _ in range(options['text_length'] // 8)
+        )
+        repeat = options['repeat']
+        self.stdout.write(
+            f'{"слов":>8} {"перебор, мс":>14} {"автомат, мс":>14}'
+        )
+        for size in SIZES:
+            words = [random_word(rng) + 'йй' for _ in range(size)]
+            matcher = Matcher(words)
+            naive = timeit.timeit(
+                lambda: naive_search(words, text), number=repeat
+            )
+            compiled = timeit.timeit(
+                lambda: matcher.search(text), number=repeat
+            )
+            self.stdout.write(
+                f'{size:>8} {naive / repeat * 1000:>14.3f} '
+                f'{compiled / repeat * 1000:>14.3f}'
+            )
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from news import loadtest
+from news.models import News
+
+
+class Recorder:
+    """Задержки и ошибки по маршрутам из нескольких потоков."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def request(self, route, send):
+        started = time.perf_counter()
+        status = send().status_code
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            if status >= 400:
+                self.errors[route] += 1
+            else:
+                self.latencies[route].append(elapsed)
+
+
+def make_client(session_key):
+    # Ошибка базы должна стать ответом 500, а не исключением.
+    client = Client(HTTP_HOST='localhost', raise_request_exception=False)
+    client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+    return client
+
+
+def write(recorder, url, session_key, count):
+    client = make_client(session_key)
+    try:
+        for number in range(count):
+            recorder.request('запись', lambda: client.post(
+                url, {'text': f'Комментарий {number}'}
+            ))
+    finally:
+        connections.close_all()
+
+
+def read(recorder, url, session_key, writing):
+    client = make_client(session_key)
+    try:
+        while writing.is_set():
+            recorder.request('чтение', lambda: client.get(url))
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Параллельные писатели комментариев к одной новости через '
+        'NewsComment, по желанию вместе с читателями её страницы. Для '
+        'сравнения профилей базы запустите команду с '
+        'NEWS_SQLITE_PROFILE=1 и без, очереди записи — с '
+        'NEWS_COMMENT_QUEUE=1 и без. Новость с комментариями после '
+        'прогона удаляется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument(
+            '--comments', type=int, default=100,
+            help='комментариев от каждого писателя',
+        )
+        parser.add_argument('--readers', type=int, default=0)
+
+    def handle(self, *args, **options):
+        user, _ = get_user_model().objects.get_or_create(
+            username='benchmark-writer'
+        )
+        session_key = loadtest.make_session_key(user)
+        news = News.objects.create(title='Бенчмарк записи', text='Текст')
+        url = reverse('news:detail', args=(news.pk,))
+        try:
+            latencies, errors, elapsed = self.run(
+                url, session_key, options
+            )
+        finally:
+            news.delete()
+        self.stdout.write(
+            f'Профиль SQLite: '
+            f'{"включён" if settings.NEWS_SQLITE_PROFILE else "выключен"}, '
+            f'очередь записи: '
+            f'{"включена" if settings.NEWS_COMMENT_QUEUE else "выключена"}, '
+            f'писателей: {options["writers"]}, '
+            f'читателей: {options["readers"]}'
+        )
+        loadtest.report(self.stdout, latencies, errors, elapsed)
+
+    def run(self, url, session_key, options):
+        recorder = Recorder()
+        writing = threading.Event()
+        writing.set()
+        writers = [
+            threading.Thread(
+                target=write,
+                args=(recorder, url, session_key, options['comments']),
+            )
+            for _ in range(options['writers'])
+        ]
+        readers = [
+            threading.Thread(
+                target=read, args=(recorder, url, session_key, writing)
+            )
+            for _ in range(options['readers'])
+        ]
+        started = time.perf_counter()
+        for thread in writers + readers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        writing.clear()
+        for thread in readers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return recorder.latencies, recorder.errors, elapsed
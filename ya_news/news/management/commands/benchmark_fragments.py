@@ -0,0 +1,73 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from news.forms import CommentForm
+from news.loadtest import percentile
+from news.models import News
+from news.pagination import KeysetPaginator
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время отрисовки шаблонов главной и страницы самой '
+        'обсуждаемой новости без запросов к базе: с пустым кэшем '
+        'фрагментов и с заполненным.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        news = News.objects.order_by('-comment_count').first()
+        if news is None:
+            raise CommandError('В базе нет новостей, запустите seed_news.')
+        request = RequestFactory().get('/')
+        request.user = news.comment_set.first().author
+        home = KeysetPaginator(
+            News.objects.all(),
+            ('-date', '-pk'),
+            settings.NEWS_COUNT_ON_HOME_PAGE,
+        ).page(None)
+        comments = KeysetPaginator(
+            news.comment_set.select_related('author'),
+            ('created', 'pk'),
+            options['comments'],
+        ).page(None)
+        pages = (
+            (f'главная, {len(home.object_list)} новостей', 'news/home.html',
+             {'object_list': home.object_list, 'page_obj': home}),
+            (f'новость, {len(comments.object_list)} комментариев',
+             'news/detail.html',
+             {'news': news, 'object': news, 'comment_page': comments,
+              'form': CommentForm()}),
+        )
+        self.stdout.write(
+            f'{"страница":<28} {"пустой кэш, мс":>15} {"с кэшем, мс":>12}'
+        )
+        for name, template, context in pages:
+            cold = self.measure(
+                template, context, request, options['repeat'], clear=True
+            )
+            warm = self.measure(
+                template, context, request, options['repeat'], clear=False
+            )
+            self.stdout.write(f'{name:<28} {cold:>15.2f} {warm:>12.2f}')
+
+    def measure(self, template, context, request, repeat, clear):
+        """Медиана времени отрисовки; запросов к базе здесь уже нет."""
+        render_to_string(template, context, request)
+        timings = []
+        for _ in range(repeat):
+            if clear:
+                caches['fragments'].clear()
+            started = time.perf_counter()
+            render_to_string(template, context, request)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        return percentile(timings, 50) * 1000
@@ -0,0 +1,52 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from news.loadtest import percentile
+from news.search import search_news
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время поиска по новостям на текущей базе: по каждому '
+        'запросу — без фильтров, за последний год и с поиском в '
+        'комментариях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'queries',
+            nargs='*',
+            default=['главном', 'новост', 'новость 12345', 'комментарий 7'],
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        year_ago = timezone.now().date() - timedelta(days=365)
+        variants = (
+            ('все даты', {}),
+            ('за год', {'date_from': year_ago}),
+            ('с комментариями', {'comments': True}),
+        )
+        self.stdout.write(
+            f'{"запрос":<20} {"вариант":<16} {"найдено":>8} '
+            f'{"p50, мс":>9} {"p99, мс":>9}'
+        )
+        for query in options['queries']:
+            for variant, kwargs in variants:
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    hits = search_news(
+                        query, settings.NEWS_SEARCH_LIMIT, **kwargs
+                    )
+                    timings.append(time.perf_counter() - started)
+                timings.sort()
+                self.stdout.write(
+                    f'{query:<20} {variant:<16} {len(hits):>8} '
+                    f'{percentile(timings, 50) * 1000:>9.1f} '
+                    f'{percentile(timings, 99) * 1000:>9.1f}'
+                )
@@ -0,0 +1,60 @@
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from news.export import EXPORTS, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает новости или комментарии в CSV или NDJSON, по желанию '
+        'за период. В stderr пишет число строк и скорость выгрузки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument(
+            '--format', choices=sorted(FORMATS), default='csv'
+        )
+        parser.add_argument('--date-from', type=date.fromisoformat)
+        parser.add_argument('--date-to', type=date.fromisoformat)
+        parser.add_argument(
+            '--output', default='-', help='файл, по умолчанию stdout'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.NEWS_EXPORT_CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        date_from = options['date_from']
+        date_to = options['date_to']
+        if date_from and date_to and date_from > date_to:
+            raise CommandError('Начало периода позже его конца.')
+        lines = export_lines(
+            options['kind'],
+            options['format'],
+            options['chunk_size'],
+            date_from=date_from,
+            date_to=date_to,
+        )
+        started = time.perf_counter()
+        if options['output'] == '-':
+            count = self.write(lines, self.stdout)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                count = self.write(lines, file)
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f'Строк: {count}, {elapsed:.1f} с, '
+            f'{count / max(elapsed, 1e-9):.0f} строк в секунду'
+        )
+
+    def write(self, lines, file):
+        count = 0
+        for count, line in enumerate(lines, start=1):
+            file.write(line)
+        return count
@@ -0,0 +1,88 @@
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from news import loadtest
+from news.models import News
+from news.pagination import NEXT, KeysetPaginator
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон по страницам YaNews: главная, следующая '
+        'страница ленты, самые обсуждаемые и случайные новости. Без '
+        '--server запросы идут через тестовый клиент в этом процессе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2_000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--server', help='адрес запущенного сервера, http://host:port'
+        )
+        parser.add_argument(
+            '--username', help='выполнять запросы от имени пользователя'
+        )
+        parser.add_argument('--samples', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        targets = self.targets(options['samples'], options['seed'])
+        if not targets:
+            raise CommandError('В базе нет новостей, запустите seed_news.')
+        session_key = None
+        if options['username']:
+            user = get_user_model().objects.get(
+                username=options['username']
+            )
+            session_key = loadtest.make_session_key(user)
+        if options['server']:
+            transport = loadtest.HTTPTransport(options['server'], session_key)
+        else:
+            transport = loadtest.InProcessTransport(session_key)
+        latencies, errors, elapsed = loadtest.run(
+            transport, targets, options['requests'], options['concurrency']
+        )
+        loadtest.report(self.stdout, latencies, errors, elapsed)
+
+    def targets(self, samples, seed):
+        rng = random.Random(seed)
+        home = reverse('news:home')
+        first_page = list(
+            News.objects.order_by('-date', '-pk')[
+                :settings.NEWS_COUNT_ON_HOME_PAGE
+            ]
+        )
+        if not first_page:
+            return []
+        paginator = KeysetPaginator(
+            News.objects.all(),
+            ('-date', '-pk'),
+            settings.NEWS_COUNT_ON_HOME_PAGE,
+        )
+        cursor = paginator.encode(NEXT, first_page[-1])
+        targets = [
+            ('news:home', home),
+            ('news:home?cursor', f'{home}?cursor={cursor}'),
+        ]
+        viral = News.objects.order_by('-comment_count').values_list(
+            'pk', flat=True
+        )[:samples]
+        targets += [
+            ('news:detail viral', reverse('news:detail', args=(pk,)))
+            for pk in viral
+        ]
+        max_pk = News.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first()
+        targets += [
+            (
+                'news:detail random',
+                reverse('news:detail', args=(rng.randint(1, max_pk),)),
+            )
+            for _ in range(samples)
+        ]
+        return targets
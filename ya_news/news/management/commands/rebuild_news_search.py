@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from news.search import INDEXES
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает полнотекстовые индексы новостей и комментариев '
+        'пачками. Обычно индексы обновляются триггерами сами, команда '
+        'нужна после восстановления из резервной копии или изменения '
+        'настроек индекса. Каждый индекс пересобирается в одной '
+        'транзакции, запись в базу на это время ждёт.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            choices=sorted(INDEXES),
+            help='пересобрать только один индекс',
+        )
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        names = [options['only']] if options['only'] else list(INDEXES)
+        for name in names:
+            done = INDEXES[name].rebuild(
+                options['batch_size'],
+                progress=lambda done: self.stdout.write(
+                    f'{name}: {done}', ending='\r'
+                ),
+            )
+            self.stdout.write('')
+            self.stdout.write(f'Индекс {name} готов, записей: {done}')
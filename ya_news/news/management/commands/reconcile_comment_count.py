@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from news.models import Comment, News
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчик комментариев у новостей.'
+
+    def handle(self, *args, **options):
+        counts = Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(
+            total=Count('pk')
+        ).values('total')
+        actual = Coalesce(Subquery(counts), 0)
+        fixed = News.objects.annotate(actual=actual).exclude(
+            comment_count=F('actual')
+        ).update(comment_count=actual)
+        self.stdout.write(f'Исправлено новостей: {fixed}')
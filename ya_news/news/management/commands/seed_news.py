@@ -0,0 +1,172 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import IntegerField, Max
+from django.db.models.functions import Cast, Substr
+from django.utils import timezone
+
+from news.cache import invalidate_home_cache
+from news.models import Comment, News
+
+User = get_user_model()
+
+
+def skewed_index(rng, size, skew):
+    """
+    Индекс от 0 до size - 1, смещённый к началу.
+
+    При skew = 1 распределение равномерное, чем больше skew, тем сильнее
+    первые элементы «вирусные»: при skew = 4 на первый процент новостей
+    приходится около трети комментариев.
+    """
+    return min(size - 1, int(size * rng.random() ** skew))
+
+
+def next_number(queryset, field, prefix):
+    """
+    Номер, с которого продолжать значения вида prefix + номер в field.
+
+    Берётся наибольший из уже занятых, а не число строк: после удалений
+    или записей не из этой команды число строк совпало бы с занятым
+    номером, и вставка упала бы на уникальности.
+    """
+    last = queryset.filter(
+        **{f'{field}__regex': rf'^{prefix}[0-9]+$'}
+    ).aggregate(
+        last=Max(Cast(Substr(field, len(prefix) + 1), IntegerField()))
+    )['last']
+    return 0 if last is None else last + 1
+
+
+@contextmanager
+def explicit_created(model):
+    """Позволяет задать created вручную, отключая auto_now_add."""
+    field = model._meta.get_field('created')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу большим объёмом синтетических данных: '
+        'пользователи, новости и комментарии с «вирусными» новостями и '
+        'активными пользователями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--news', type=int, default=1_000_000)
+        parser.add_argument('--comments', type=int, default=50_000_000)
+        parser.add_argument(
+            '--news-skew',
+            type=float,
+            default=4.0,
+            help='насколько комментарии сосредоточены на свежих новостях',
+        )
+        parser.add_argument(
+            '--user-skew',
+            type=float,
+            default=3.0,
+            help='насколько комментарии сосредоточены у активных авторов',
+        )
+        parser.add_argument('--days', type=int, default=3650)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        user_ids = self.create_users(options['users'])
+        news_ids = self.create_news(options['news'], options['days'])
+        self.create_comments(
+            options['comments'],
+            news_ids,
+            user_ids,
+            options['news_skew'],
+            options['user_skew'],
+            options['days'],
+        )
+        call_command('reconcile_comment_count', stdout=self.stdout)
+        # bulk_create не отправляет сигналы, сбрасываем кэш сами.
+        invalidate_home_cache()
+
+    def batches(self, total, build, keep_ids=True):
+        """
+        Создаёт объекты пачками по batch_size, каждую в транзакции.
+
+        Возвращает список pk созданных объектов, если keep_ids.
+        """
+        created = []
+        done = 0
+        for start in range(0, total, self.batch_size):
+            objects = [
+                build(index)
+                for index in range(start, min(total, start + self.batch_size))
+            ]
+            model = type(objects[0])
+            with transaction.atomic():
+                model.objects.bulk_create(objects)
+            if keep_ids:
+                created.extend(obj.pk for obj in objects)
+            done += len(objects)
+            self.stdout.write(
+                f'{model._meta.verbose_name}: {done} из {total}', ending='\r'
+            )
+        self.stdout.write('')
+        return created
+
+    def create_users(self, total):
+        # Хэш пароля считается один раз: для всех пользователей он общий.
+        password = make_password('password')
+        offset = next_number(User.objects, 'username', 'user')
+        return self.batches(total, lambda index: User(
+            username=f'user{offset + index}', password=password
+        ))
+
+    def create_news(self, total, days):
+        # Новости идут от старых к новым, по одной новой каждые пару часов.
+        step = timedelta(days=days) / max(total, 1)
+        start = self.now - timedelta(days=days)
+        return self.batches(total, lambda index: News(
+            title=f'Новость {index}',
+            text=' '.join(
+                self.rng.choice(('Текст', 'новости', 'о', 'главном'))
+                for _ in range(self.rng.randint(20, 200))
+            ),
+            date=(start + step * index).date(),
+        ))
+
+    def create_comments(
+        self, total, news_ids, user_ids, news_skew, user_skew, days
+    ):
+        if not news_ids or not user_ids:
+            return
+        # Свежие новости в конце списка, «вирусными» делаем их.
+        newest_first = news_ids[::-1]
+        rng = self.rng
+        period = timedelta(days=days).total_seconds()
+
+        def build(index):
+            return Comment(
+                news_id=newest_first[
+                    skewed_index(rng, len(newest_first), news_skew)
+                ],
+                author_id=user_ids[
+                    skewed_index(rng, len(user_ids), user_skew)
+                ],
+                text=f'Комментарий {index}',
+                created=self.now - timedelta(seconds=rng.random() * period),
+            )
+
+        with explicit_created(Comment):
+            self.batches(total, build, keep_ids=False)
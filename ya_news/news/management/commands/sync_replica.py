@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from news.replica import PRIMARY, REPLICA, copy_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу в реплику для чтения. Заменяет '
+        'репликацию при локальной проверке: с --interval копирует '
+        'по кругу, и реплика отстаёт не больше чем на интервал.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help='повторять каждые столько секунд',
+        )
+        parser.add_argument(
+            '--pages', type=int, default=-1,
+            help='страниц за шаг копирования, по умолчанию все сразу',
+        )
+
+    def handle(self, *args, **options):
+        if REPLICA not in settings.DATABASES:
+            raise CommandError(
+                'Реплика не настроена, задайте NEWS_REPLICA_DB.'
+            )
+        source = settings.DATABASES[PRIMARY]['NAME']
+        target = settings.DATABASES[REPLICA]['NAME']
+        while True:
+            started = time.perf_counter()
+            copy_database(source, target, options['pages'])
+            self.stdout.write(
+                f'{source} -> {target}: '
+                f'{(time.perf_counter() - started) * 1000:.0f} мс'
+            )
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:50
+
+import datetime
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_count(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    Comment = apps.get_model('news', 'Comment')
+    counts = Comment.objects.filter(
+        news=OuterRef('pk')
+    ).order_by().values('news').annotate(total=Count('pk')).values('total')
+    News.objects.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='news',
+            name='date',
+            field=models.DateField(default=datetime.datetime.today),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_news_comment_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['news', 'created', 'id'], name='comment_news_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['-date', '-id'], name='news_date_id_idx'),
+        ),
+    ]
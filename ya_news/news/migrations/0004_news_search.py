@@ -0,0 +1,67 @@
+from django.db import migrations
+
+
+def fts_sql(table, source, columns):
+    """
+    Таблица FTS5 с внешним содержимым и триггеры, которые обновляют её
+    при любой записи в source, в том числе из bulk_create() и update().
+
+    Префиксы до шести символов хранятся в индексе отдельно: без этого
+    FTS5 собирает список документов для префикса в памяти из всех
+    подходящих слов, и для частых слов это сотня миллисекунд.
+    """
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    create = [
+        f"""
+        CREATE VIRTUAL TABLE {table} USING fts5(
+            {names},
+            content='{source}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6'
+        )
+        """,
+        f"""
+        CREATE TRIGGER {table}_insert AFTER INSERT ON {source} BEGIN
+            INSERT INTO {table}(rowid, {names}) VALUES (new.id, {new});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {table}_delete AFTER DELETE ON {source} BEGIN
+            INSERT INTO {table}({table}, rowid, {names})
+            VALUES ('delete', old.id, {old});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {table}_update AFTER UPDATE OF {names} ON {source}
+        BEGIN
+            INSERT INTO {table}({table}, rowid, {names})
+            VALUES ('delete', old.id, {old});
+            INSERT INTO {table}(rowid, {names}) VALUES (new.id, {new});
+        END
+        """,
+        f"INSERT INTO {table}({table}) VALUES ('rebuild')",
+    ]
+    drop = [
+        f'DROP TRIGGER IF EXISTS {table}_update',
+        f'DROP TRIGGER IF EXISTS {table}_delete',
+        f'DROP TRIGGER IF EXISTS {table}_insert',
+        f'DROP TABLE IF EXISTS {table}',
+    ]
+    return create, drop
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_news_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            *fts_sql('news_news_fts', 'news_news', ('title', 'text'))
+        ),
+        migrations.RunSQL(
+            *fts_sql('news_comment_fts', 'news_comment', ('text',))
+        ),
+    ]
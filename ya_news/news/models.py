@@ -8,9 +8,13 @@ class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -32,6 +36,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
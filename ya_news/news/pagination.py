@@ -0,0 +1,192 @@
+import base64
+import binascii
+import json
+from functools import cached_property
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Max, Q
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(ValueError):
+    """Курсор повреждён или не подходит к этому списку."""
+
+
+class KeysetPage:
+    """Страница, полученная по курсору."""
+
+    def __init__(self, paginator, object_list, has_previous):
+        self.paginator = paginator
+        self.object_list = object_list
+        self.has_previous = has_previous
+
+    @cached_property
+    def _rows(self):
+        return list(self.object_list)
+
+    @property
+    def has_next(self):
+        """
+        Полная страница означает, что дальше, возможно, есть ещё записи.
+
+        Лишний запрос ради точного ответа не делаем: в худшем случае
+        последняя ссылка приведёт на пустую страницу.
+        """
+        return len(self._rows) == self.paginator.per_page
+
+    @property
+    def next_cursor(self):
+        if not self.has_next:
+            return None
+        return self.paginator.encode(NEXT, self._rows[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous or not self._rows:
+            return None
+        return self.paginator.encode(PREVIOUS, self._rows[0])
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по ключу сортировки, а не по смещению.
+
+    Страница выбирается условием «строго после последней записи
+    предыдущей страницы», поэтому любая страница стоит столько же,
+    сколько первая: база идёт по индексу и не пропускает OFFSET строк.
+    Последнее поле сортировки должно быть уникальным (обычно pk).
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset.order_by(*ordering)
+        self.fields = [field.lstrip('-') for field in ordering]
+        self.descending = [field.startswith('-') for field in ordering]
+        self.per_page = per_page
+
+    def encode(self, direction, obj):
+        values = [getattr(obj, field) for field in self.fields]
+        payload = json.dumps([direction, values], default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode(self, cursor):
+        padding = '=' * (-len(cursor) % 4)
+        try:
+            direction, values = json.loads(
+                base64.urlsafe_b64decode(cursor + padding)
+            )
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+            raise InvalidCursor(cursor)
+        if direction not in (NEXT, PREVIOUS) or (
+            not isinstance(values, list) or len(values) != len(self.fields)
+        ):
+            raise InvalidCursor(cursor)
+        # encode() пишет только строки и числа; null, true, списки и
+        # объекты приходят лишь в подделанном курсоре.
+        if not all(
+            isinstance(value, (str, int)) and not isinstance(value, bool)
+            for value in values
+        ):
+            raise InvalidCursor(cursor)
+        opts = self.queryset.model._meta
+        try:
+            # clean() проверяет ещё и null и диапазон чисел для базы.
+            values = [
+                (opts.pk if name == 'pk' else opts.get_field(name)).clean(
+                    value, None
+                )
+                for name, value in zip(self.fields, values)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def _beyond(self, values, forward, inclusive=False):
+        """
+        Условие «после» (или «до») ключа values в порядке сортировки.
+
+        Для ключа (a, b) по убыванию это a < x OR (a = x AND b < y).
+        """
+        condition = Q(**dict(zip(self.fields, values))) if inclusive else Q()
+        for index, field in enumerate(self.fields):
+            lookup = 'lt' if self.descending[index] == forward else 'gt'
+            equal = dict(zip(self.fields[:index], values[:index]))
+            condition |= Q(**equal, **{f'{field}__{lookup}': values[index]})
+        return condition
+
+    def _previous_start(self, values):
+        """
+        Ключ первой записи страницы перед values.
+
+        Одна лишняя строка говорит, есть ли что-то ещё раньше.
+        """
+        return self.queryset.filter(
+            self._beyond(values, forward=False)
+        ).reverse().values_list(*self.fields)[
+            self.per_page - 1:self.per_page + 1
+        ]
+
+    def _from_start(self, start):
+        if not start:
+            return self.queryset, False
+        return self.queryset.filter(
+            self._beyond(start[0], forward=True, inclusive=True)
+        ), len(start) > 1
+
+    def page(self, cursor=None):
+        """Страница после (или перед) записью из курсора."""
+        queryset = self.queryset
+        has_previous = False
+        if cursor:
+            direction, values = self.decode(cursor)
+            if direction == NEXT:
+                queryset = queryset.filter(self._beyond(values, forward=True))
+                has_previous = True
+            else:
+                start = list(self._previous_start(values))
+                queryset, has_previous = self._from_start(start)
+        return KeysetPage(self, queryset[:self.per_page], has_previous)
+
+    async def apage(self, cursor=None):
+        """Асинхронный page(): записи страницы загружаются сразу."""
+        queryset = self.queryset
+        has_previous = False
+        if cursor:
+            direction, values = self.decode(cursor)
+            if direction == NEXT:
+                queryset = queryset.filter(self._beyond(values, forward=True))
+                has_previous = True
+            else:
+                start = [key async for key in self._previous_start(values)]
+                queryset, has_previous = self._from_start(start)
+        object_list = [obj async for obj in queryset[:self.per_page]]
+        return KeysetPage(self, object_list, has_previous)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для админки, которому не нужен COUNT(*) по всей таблице.
+
+    SQLite считает строки полным проходом по индексу, на миллионах
+    комментариев это секунды на каждое открытие списка. Без фильтров
+    число строк оценивается по наибольшему первичному ключу и помечается
+    атрибутом estimated: удалённые строки оценку завышают, и последние
+    страницы по ней могут оказаться пустыми. С фильтром или поиском
+    строки считаются честно.
+    """
+    estimated = False
+
+    @cached_property
+    def count(self):
+        if self.object_list.query.has_filters():
+            return super().count
+        self.estimated = True
+        return self.object_list.aggregate(last=Max('pk'))['last'] or 0
+
+    def count_exactly(self):
+        """Заменяет оценку честным числом строк."""
+        self.__dict__.pop('num_pages', None)
+        self.estimated = False
+        self.count = self.object_list.count()
@@ -0,0 +1,161 @@
+import os
+import re
+import threading
+import unicodedata
+
+from django.conf import settings
+
+# Латинские буквы и цифры, которыми подменяют похожие кириллические.
+HOMOGLYPHS = str.maketrans({
+    'a': 'а',
+    'b': 'в',
+    'c': 'с',
+    'e': 'е',
+    'h': 'н',
+    'k': 'к',
+    'm': 'м',
+    'o': 'о',
+    'p': 'р',
+    't': 'т',
+    'u': 'и',
+    'x': 'х',
+    'y': 'у',
+    'ё': 'е',
+    '0': 'о',
+    '3': 'з',
+    '6': 'б',
+})
+SEPARATORS = re.compile(r'[\W_]+')
+
+
+def normalize(text):
+    """
+    Приводит текст к виду, в котором сравниваются слова.
+
+    Совместимые символы раскладываются (NFKC), регистр убирается,
+    похожие латинские буквы заменяются кириллическими, а всё, что не
+    является буквой или цифрой, становится одним пробелом: слово из
+    списка не найдётся на стыке двух соседних слов. Подряд идущие
+    одиночные буквы склеиваются, так что «р е д и с к а», «р.е.д.и.с.к.а»
+    и «pедиcкa» с латинскими буквами превращаются в «редиска».
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    words = []
+    spelled = False
+    for word in SEPARATORS.split(text.translate(HOMOGLYPHS)):
+        if not word:
+            continue
+        if spelled and len(word) == 1:
+            words[-1] += word
+        else:
+            words.append(word)
+        spelled = len(word) == 1
+    return ' '.join(words)
+
+
+class Matcher:
+    """
+    Автомат Ахо — Корасик для поиска любого слова из списка.
+
+    Строится один раз, после чего проверка текста занимает время,
+    пропорциональное его длине, и не зависит от количества слов.
+    """
+
+    def __init__(self, words):
+        self.transitions = [{}]
+        self.fail = [0]
+        self.terminal = [False]
+        for word in words:
+            self._add(normalize(word))
+        self._link()
+
+    def _add(self, word):
+        if not word:
+            return
+        state = 0
+        for char in word:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][char] = next_state
+                self.transitions.append({})
+                self.fail.append(0)
+                self.terminal.append(False)
+            state = next_state
+        self.terminal[state] = True
+
+    def _link(self):
+        """Проставляем суффиксные ссылки обходом бора в ширину."""
+        queue = list(self.transitions[0].values())
+        for state in queue:
+            for char, next_state in self.transitions[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.transitions[fallback].get(char, 0)
+                self.terminal[next_state] |= self.terminal[
+                    self.fail[next_state]
+                ]
+                queue.append(next_state)
+
+    def search(self, text):
+        """Есть ли в тексте хотя бы одно слово из списка."""
+        transitions = self.transitions
+        fail = self.fail
+        terminal = self.terminal
+        state = 0
+        for char in normalize(text):
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+            if terminal[state]:
+                return True
+        return False
+
+
+class BadWordsFilter:
+    """
+    Фильтр запрещённых слов с перезагрузкой списка на лету.
+
+    К встроенным словам добавляются слова из файла
+    settings.NEWS_BAD_WORDS_FILE (по одному на строку, строки с # —
+    комментарии). Если файл изменился, автомат пересобирается при
+    следующей проверке, перезапускать процессы не нужно.
+    """
+
+    def __init__(self, words):
+        self.words = tuple(words)
+        self._lock = threading.Lock()
+        self._source = None
+        self._matcher = None
+
+    def _current_source(self):
+        path = settings.NEWS_BAD_WORDS_FILE
+        if not path:
+            return None
+        try:
+            return path, os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return path, None
+
+    def _load(self, source):
+        words = list(self.words)
+        if source and source[1] is not None:
+            with open(source[0], encoding='utf-8') as file:
+                words.extend(
+                    line.strip() for line in file
+                    if line.strip() and not line.startswith('#')
+                )
+        return Matcher(words)
+
+    def get_matcher(self):
+        source = self._current_source()
+        if self._matcher is None or source != self._source:
+            with self._lock:
+                if self._matcher is None or source != self._source:
+                    self._matcher = self._load(source)
+                    self._source = source
+        return self._matcher
+
+    def contains(self, text):
+        return self.get_matcher().search(text)
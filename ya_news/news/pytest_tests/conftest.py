@@ -1,12 +1,18 @@
-from datetime import timedelta
-
 import pytest
+from asgiref.sync import async_to_sync
 from django.conf import settings
-from django.test.client import Client
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache, caches
+from django.test.client import AsyncRequestFactory, Client
 from django.urls import reverse
-from django.utils import timezone
 
 from news.models import Comment, News
+from news.pytest_tests.factories import (
+    FAST_PASSWORD_HASHERS,
+    make_comments,
+    make_news,
+)
+from news.query_budget import query_stats_recorded
 
 NEWS_LIMIT = settings.NEWS_COUNT_ON_HOME_PAGE
 NEWS_CREATE_COUNT = NEWS_LIMIT + 1
@@ -15,6 +21,48 @@ COMMENT_TEXT = "Комментарий"
 NEW_COMMENT_TEXT = "Новый текст комментария"
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    caches["fragments"].clear()
+    caches["pages"].clear()
+
+
+@pytest.fixture(autouse=True)
+def fast_password_hasher(settings):
+    settings.PASSWORD_HASHERS = FAST_PASSWORD_HASHERS
+
+
+@pytest.fixture(autouse=True)
+def query_budget(request, settings):
+    """
+    Проваливает тест, если view сделала больше запросов, чем разрешено.
+    View с лимитом не должна и повторять один и тот же SQL: обычно это
+    N+1 в шаблоне.
+
+    Лимиты берутся из settings.QUERY_BUDGETS, для отдельного теста их
+    можно переопределить меткой @pytest.mark.query_budget(view, limit).
+    """
+    settings.QUERY_BUDGET_ENABLED = True
+    budgets = dict(settings.QUERY_BUDGETS)
+    for marker in reversed(list(request.node.iter_markers("query_budget"))):
+        budgets[marker.args[0]] = marker.args[1]
+    exceeded = []
+
+    def check(stats, **kwargs):
+        budget = budgets.get(stats.view_name)
+        if budget is not None and stats.count > budget:
+            exceeded.append(f"лимит {budget}: {stats}")
+        if budget is not None and stats.duplicates:
+            exceeded.append(f"повторы: {stats} {stats.duplicates}")
+
+    query_stats_recorded.connect(check, weak=False)
+    yield
+    query_stats_recorded.disconnect(check)
+    if exceeded:
+        pytest.fail("\n".join(exceeded), pytrace=False)
+
+
 @pytest.fixture
 def author(django_user_model):
     return django_user_model.objects.create(username="author")
@@ -39,6 +87,23 @@ def reader_client(reader):
     return client
 
 
+@pytest.fixture
+def async_get():
+    """Вызов асинхронной view анонимным пользователем."""
+    factory = AsyncRequestFactory()
+
+    async def auser():
+        return AnonymousUser()
+
+    def get(view_class, path, **kwargs):
+        request = factory.get(path)
+        request.user = AnonymousUser()
+        request.auser = auser
+        return async_to_sync(view_class.as_view())(request, **kwargs)
+
+    return get
+
+
 @pytest.fixture
 def news():
     return News.objects.create(title="Заголовок", text="Текст")
@@ -73,6 +138,11 @@ def logout_url():
     return reverse("users:logout")
 
 
+@pytest.fixture
+def search_url():
+    return reverse("news:search")
+
+
 @pytest.fixture
 def detail_url(news):
     return reverse("news:detail", args=(news.id,))
@@ -90,27 +160,9 @@ def delete_url(comment):
 
 @pytest.fixture
 def news_list():
-    now = timezone.now()
-    for i in range(NEWS_CREATE_COUNT):
-        News.objects.create(
-            title=f"News {i}",
-            text="Text",
-            date=now - timedelta(minutes=i),
-        )
+    return make_news(NEWS_CREATE_COUNT)
 
 
 @pytest.fixture
 def comments_list(author, news):
-    now = timezone.now()
-    items = []
-    for i in range(5):
-        obj = Comment.objects.create(
-            news=news,
-            author=author,
-            text=f"c{i}",
-        )
-        items.append(obj)
-
-    for idx, obj in enumerate(items):
-        dt = now - timedelta(minutes=(10 - idx))
-        Comment.objects.filter(pk=obj.pk).update(created=dt)
+    return make_comments(news, [author], 5, text="c{}")
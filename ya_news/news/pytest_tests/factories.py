@@ -0,0 +1,83 @@
+"""
+Тестовые данные одним INSERT на модель.
+
+Фабрики годятся и для пары объектов, и для десятков тысяч: объекты
+собираются в памяти и сохраняются через bulk_create(), пароль
+хэшируется один раз на вызов, даты задаются явно. Сигналы при этом не
+отправляются, поэтому счётчики комментариев и кэш главной фабрики
+обновляют сами.
+
+Дату комментария auto_now_add при вставке заменяет текущей, поэтому
+она проставляется вторым запросом, bulk_update(), а не отключением
+auto_now_add: атрибут поля общий для всех потоков процесса.
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db.models import F
+from django.utils import timezone
+
+from news.cache import invalidate_home_cache
+from news.models import Comment, News
+
+User = get_user_model()
+
+# Быстрый хэшер для тестов: PBKDF2 тратит на пароль сотни миллисекунд.
+FAST_PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def make_users(usernames, password=None):
+    """Пользователи с именами usernames; без password — без пароля."""
+    hashed = make_password(password)
+    return User.objects.bulk_create(
+        User(username=username, password=hashed) for username in usernames
+    )
+
+
+def make_news(count, start=None, step=timedelta(days=1)):
+    """
+    Новости в количестве count: первая датирована start (по умолчанию
+    сегодня), каждая следующая на step раньше.
+    """
+    start = start or timezone.now()
+    news = News.objects.bulk_create(
+        News(
+            title=f"Новость {index}",
+            text="Текст",
+            date=(start - step * index).date(),
+        )
+        for index in range(count)
+    )
+    invalidate_home_cache()
+    return news
+
+
+def make_comments(
+    news, authors, count, start=None, step=timedelta(minutes=1),
+    text="Комментарий {}",
+):
+    """
+    Комментарии к news в количестве count, от старых к новым.
+
+    Первый создан в start (по умолчанию count * step назад), каждый
+    следующий на step позже. Авторы берутся из authors по кругу,
+    text — шаблон с номером комментария.
+    """
+    start = start or timezone.now() - step * count
+    comments = Comment.objects.bulk_create(
+        Comment(
+            news=news,
+            author=authors[index % len(authors)],
+            text=text.format(index),
+        )
+        for index in range(count)
+    )
+    for index, comment in enumerate(comments):
+        comment.created = start + step * index
+    Comment.objects.bulk_update(comments, ["created"], batch_size=500)
+    News.objects.filter(pk=news.pk).update(
+        comment_count=F("comment_count") + count
+    )
+    invalidate_home_cache()
+    return comments
@@ -0,0 +1,136 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+
+from news.admin import CommentAdmin, CommentPageFormSet
+from news.models import Comment, News
+from news.pagination import EstimatedCountPaginator
+from news.pytest_tests.factories import make_comments
+
+pytestmark = pytest.mark.django_db
+
+COMMENTS_COUNT = CommentPageFormSet.per_page + 5
+
+
+@pytest.fixture
+def many_comments(author, news):
+    return make_comments(news, [author], COMMENTS_COUNT)
+
+
+@pytest.fixture
+def change_url(news):
+    return reverse("admin:news_news_change", args=(news.pk,))
+
+
+def override_list_per_page(per_page):
+    return mock.patch.object(CommentAdmin, "list_per_page", per_page)
+
+
+def comment_forms(response):
+    formset = response.context["inline_admin_formsets"][0].formset
+    return formset.initial_form_count()
+
+
+@pytest.mark.usefixtures("many_comments")
+def test_change_page_shows_one_page_of_comments(admin_client, change_url):
+    response = admin_client.get(change_url)
+    assert response.status_code == HTTPStatus.OK
+    assert comment_forms(response) == CommentPageFormSet.per_page
+    assert "?comments_page=2" in response.content.decode()
+
+
+@pytest.mark.usefixtures("many_comments")
+def test_change_page_comments_next_page(admin_client, change_url):
+    response = admin_client.get(change_url, {"comments_page": 2})
+    assert comment_forms(response) == 5
+
+
+def test_change_page_saves_comments_page(
+    admin_client, change_url, news, many_comments
+):
+    response = admin_client.get(change_url, {"comments_page": 2})
+    prefix = response.context["inline_admin_formsets"][0].formset.prefix
+    last = many_comments[-5:]
+    data = {
+        "title": news.title,
+        "text": news.text,
+        "date": f"{news.date:%Y-%m-%d}",
+        f"{prefix}-TOTAL_FORMS": len(last),
+        f"{prefix}-INITIAL_FORMS": len(last),
+    }
+    for index, comment in enumerate(last):
+        data.update(
+            {
+                f"{prefix}-{index}-id": comment.pk,
+                f"{prefix}-{index}-news": news.pk,
+                f"{prefix}-{index}-author": comment.author_id,
+                f"{prefix}-{index}-text": "Исправлено",
+            }
+        )
+    admin_client.post(f"{change_url}?comments_page=2", data)
+    assert Comment.objects.filter(text="Исправлено").count() == len(last)
+
+
+@pytest.mark.usefixtures("many_comments")
+def test_comment_changelist(admin_client, news, django_assert_max_num_queries):
+    url = reverse("admin:news_comment_changelist")
+    # Сессия, пользователь, число строк, страница: без запроса на строку.
+    with django_assert_max_num_queries(6):
+        response = admin_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    response = admin_client.get(url, {"news__id__exact": news.pk})
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_estimated_count(news, author):
+    News.objects.create(title="Удалённая", text="Текст").delete()
+    paginator = EstimatedCountPaginator(News.objects.all(), 10)
+    assert paginator.count >= News.objects.count()
+    paginator = EstimatedCountPaginator(News.objects.filter(pk=news.pk), 10)
+    assert paginator.count == 1
+
+
+def test_estimated_count_clamped_on_empty_page(admin_client, news, author):
+    comments = make_comments(news, [author], 5)
+    Comment.objects.filter(pk__in=[c.pk for c in comments[:-1]]).delete()
+    url = reverse("admin:news_comment_changelist")
+    with override_list_per_page(1):
+        response = admin_client.get(url)
+        assert "около 5" in response.content.decode()
+        response = admin_client.get(url, {"p": 5})
+    assert response.context["cl"].result_count == 1
+    assert list(response.context["cl"].result_list) == [comments[-1]]
+    assert "около" not in response.content.decode()
+
+
+def test_comment_count_follows_admin(admin_client, news, author):
+    comments = make_comments(news, [author], 3)
+    News.objects.filter(pk=news.pk).update(comment_count=3)
+    other = News.objects.create(title="Другая", text="Текст")
+
+    admin_client.post(
+        reverse("admin:news_comment_add"),
+        {"news": news.pk, "author": author.pk, "text": "Новый"},
+    )
+    admin_client.post(
+        reverse("admin:news_comment_change", args=(comments[0].pk,)),
+        {"news": other.pk, "author": author.pk, "text": "Перенесён"},
+    )
+    admin_client.post(
+        reverse("admin:news_comment_delete", args=(comments[1].pk,)),
+        {"post": "yes"},
+    )
+    admin_client.post(
+        reverse("admin:news_comment_changelist"),
+        {
+            "action": "delete_selected",
+            "_selected_action": [comments[2].pk],
+            "post": "yes",
+        },
+    )
+    news.refresh_from_db()
+    other.refresh_from_db()
+    assert news.comment_count == news.comment_set.count() == 1
+    assert other.comment_count == 1
@@ -0,0 +1,59 @@
+from http import HTTPStatus
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.contrib.auth import BACKEND_SESSION_KEY
+
+pytestmark = pytest.mark.django_db
+
+migration = import_module("news.migrations.0005_cached_backend_sessions")
+
+
+def test_warm_request_skips_session_and_user_queries(
+    author_client, author, edit_url, django_assert_num_queries
+):
+    author_client.get(edit_url)
+
+    # Остаётся только SELECT комментария.
+    with django_assert_num_queries(1) as context:
+        response = author_client.get(edit_url)
+    assert "news_comment" in context.captured_queries[0]["sql"]
+    assert response.context["user"] == author
+
+
+def test_password_change_ends_cached_sessions(
+    author_client, author, edit_url, django_capture_on_commit_callbacks
+):
+    author_client.get(edit_url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        author.set_password("new-password")
+        author.save()
+
+    response = author_client.get(edit_url)
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_deactivated_user_logged_out(
+    author_client, author, edit_url, django_capture_on_commit_callbacks
+):
+    author_client.get(edit_url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        author.is_active = False
+        author.save()
+
+    response = author_client.get(edit_url)
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_sessions_of_plain_model_backend_moved(client, author, edit_url):
+    client.force_login(author, backend=migration.MODEL_BACKEND)
+    client.get(edit_url)
+
+    migration.use_cached_backend(apps, None)
+
+    response = client.get(edit_url)
+    assert response.status_code == HTTPStatus.OK
+    assert client.session[BACKEND_SESSION_KEY] == migration.CACHED_BACKEND
@@ -1,11 +1,30 @@
+import asyncio
+import base64
+import json
+from datetime import timedelta
+from http import HTTPStatus
+
 import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
 from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import AsyncClient
 
+from news.async_views import AsyncNewsDetail, AsyncNewsList
 from news.forms import CommentForm
+from news.models import Comment
+from news.pytest_tests.factories import make_comments, make_users
+from news.query_budget import (
+    QueryBudgetMiddleware,
+    query_stats_recorded,
+    record_query,
+)
 
 pytestmark = pytest.mark.django_db
 
 NEWS_LIMIT = settings.NEWS_COUNT_ON_HOME_PAGE
+NEWS_CREATE_COUNT = NEWS_LIMIT + 1
 
 
 def test_news_count_limited(client, home_url, news_list):
@@ -23,6 +42,126 @@ def test_news_sorted_new_to_old(client, home_url, news_list):
     assert dates == expected
 
 
+def test_news_pages_walk_forward_and_back(client, home_url, news_list):
+    first = client.get(home_url).context["page_obj"]
+    assert first.previous_cursor is None
+
+    response = client.get(home_url, {"cursor": first.next_cursor})
+    second = list(response.context["object_list"])
+    assert len(second) == NEWS_CREATE_COUNT - NEWS_LIMIT
+    last = list(first.object_list)[-1]
+    assert (second[0].date, second[0].pk) < (last.date, last.pk)
+
+    previous = response.context["page_obj"].previous_cursor
+    response = client.get(home_url, {"cursor": previous})
+    assert list(response.context["object_list"]) == list(first.object_list)
+
+
+def test_broken_cursor_is_not_found(client, home_url):
+    response = client.get(home_url, {"cursor": "broken"})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    "payload",
+    (
+        ["n", [None, None]],
+        ["p", [None, None]],
+        ["n", [5, 1]],
+        ["n", ["2024-01-01"]],
+        ["n", ["2024-01-01", True]],
+        ["n", ["2024-01-01", [1]]],
+        ["n", ["2024-01-01", 10**30]],
+    ),
+)
+def test_forged_cursor_is_not_found(client, home_url, detail_url, payload):
+    cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+    for url in (home_url, detail_url):
+        response = client.get(url, {"cursor": cursor})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_comments_paginated(client, detail_url, comments_list, settings):
+    settings.NEWS_COMMENTS_PER_PAGE = 3
+    page = client.get(detail_url).context["comment_page"]
+    assert len(list(page.object_list)) == 3
+
+    response = client.get(detail_url, {"cursor": page.next_cursor})
+    rest = list(response.context["comment_page"].object_list)
+    assert [obj.text for obj in rest] == ["c3", "c4"]
+
+
+def test_comment_pages_cover_all_comments(client, detail_url, news, settings):
+    settings.NEWS_COMMENTS_PER_PAGE = 50
+    authors = make_users(f"user{i}" for i in range(10))
+    # Одна секунда на много комментариев: порядок решает pk.
+    comments = make_comments(news, authors, 1000, step=timedelta(0))
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        page = client.get(detail_url, {"cursor": cursor}).context[
+            "comment_page"
+        ]
+        seen.extend(obj.pk for obj in page.object_list)
+        cursor = page.next_cursor
+    assert seen == [comment.pk for comment in comments]
+
+
+def test_home_page_served_from_cache(
+    client, home_url, news_list, django_assert_num_queries
+):
+    first = client.get(home_url)
+    with django_assert_num_queries(0):
+        second = client.get(home_url)
+    assert second.content == first.content
+
+
+def test_home_pages_cached_apart_from_sessions(
+    author_client, home_url, news_list, django_assert_num_queries
+):
+    author_client.get(home_url)
+    author_client.get(home_url)
+    caches["pages"].clear()
+    # Сессия и пользователь остались в основном кэше, страница — нет.
+    with django_assert_num_queries(1):
+        author_client.get(home_url)
+
+
+def test_home_cache_reset_on_comment(
+    client, home_url, author, news, django_capture_on_commit_callbacks
+):
+    client.get(home_url)
+    with django_capture_on_commit_callbacks() as callbacks:
+        Comment.objects.create(news=news, author=author, text="Новый")
+        # До фиксации версия прежняя: ленту не соберут из старых данных
+        # под новой версией.
+        assert client.get(home_url).context is None
+    for callback in callbacks:
+        callback()
+    response = client.get(home_url)
+    assert response.context is not None
+
+
+def test_edited_comment_not_served_from_fragment_cache(
+    client, detail_url, comment
+):
+    client.get(detail_url)
+    comment.text = "Исправленный текст"
+    comment.save()
+
+    response = client.get(detail_url)
+
+    assert "Исправленный текст" in response.content.decode()
+
+
+def test_comment_links_outside_fragment_cache(
+    reader_client, author_client, detail_url, edit_url
+):
+    # Читатель заполняет кэш фрагментов, ссылок в нём быть не должно.
+    assert edit_url not in reader_client.get(detail_url).content.decode()
+    assert edit_url in author_client.get(detail_url).content.decode()
+
+
 def test_comments_sorted_old_to_new(client, detail_url, comments_list):
     response = client.get(detail_url)
     news_obj = response.context["news"]
@@ -42,3 +181,91 @@ def test_auth_has_form(author_client, detail_url):
     response = author_client.get(detail_url)
     assert "form" in response.context
     assert isinstance(response.context["form"], CommentForm)
+
+
+def test_async_home_matches_sync(client, async_get, home_url, news_list):
+    expected = client.get(home_url).content
+    cache.clear()
+    response = async_get(AsyncNewsList, home_url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == expected
+
+
+def test_async_detail_lists_comments(async_get, detail_url, news, comment):
+    response = async_get(AsyncNewsDetail, detail_url, pk=news.pk)
+    assert response.status_code == HTTPStatus.OK
+    assert comment.text in response.content.decode()
+    assert response.has_header("ETag")
+
+
+@pytest.mark.query_budget("news:detail", 5)
+def test_detail_has_no_repeated_queries(
+    author_client, detail_url, news, author, reader
+):
+    for user in (author, reader):
+        Comment.objects.create(news=news, author=user, text="Текст")
+    recorded = []
+
+    def record(stats, **kwargs):
+        recorded.append(stats)
+
+    query_stats_recorded.connect(record)
+    try:
+        author_client.get(detail_url)
+    finally:
+        query_stats_recorded.disconnect(record)
+
+    (stats,) = recorded
+    assert stats.view_name == "news:detail"
+    assert stats.duplicates == {}
+
+
+def test_query_budget_counts_async_requests(home_url, news):
+    recorded = []
+
+    def record(stats, **kwargs):
+        recorded.append(stats)
+
+    query_stats_recorded.connect(record)
+    try:
+        response = async_to_sync(AsyncClient().get)(home_url)
+    finally:
+        query_stats_recorded.disconnect(record)
+
+    assert response.status_code == HTTPStatus.OK
+    (stats,) = recorded
+    assert stats.view_name == "news:home"
+    assert stats.count > 0
+
+
+def test_query_budget_separates_overlapping_requests(
+    home_url, detail_url, news
+):
+    recorded = {}
+
+    def record(stats, **kwargs):
+        recorded[stats.view_name] = stats.count
+
+    async def get_both():
+        client = AsyncClient()
+        await asyncio.gather(client.get(home_url), client.get(detail_url))
+
+    query_stats_recorded.connect(record)
+    try:
+        async_to_sync(get_both)()
+        overlapped = dict(recorded)
+        caches["pages"].clear()
+        for url in (home_url, detail_url):
+            async_to_sync(AsyncClient().get)(url)
+    finally:
+        query_stats_recorded.disconnect(record)
+
+    assert overlapped == recorded
+    assert connection.execute_wrappers.count(record_query) <= 1
+
+
+def test_query_budget_middleware_keeps_chain_async():
+    async def get_response(request):
+        pass
+
+    assert iscoroutinefunction(QueryBudgetMiddleware(get_response))
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from news.models import Comment, News
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def admin_client(client, django_user_model):
+    admin = django_user_model.objects.create(username="admin", is_staff=True)
+    client.force_login(admin)
+    return client
+
+
+def export_url(kind, format):
+    return reverse("news:export", args=(kind, format))
+
+
+def content(response):
+    assert response.streaming
+    return b"".join(response.streaming_content).decode()
+
+
+def test_export_only_for_staff(author_client):
+    response = author_client.get(export_url("news", "csv"))
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_news_csv_filtered_by_date(admin_client):
+    News.objects.create(title="Старая", text="Т", date=date(2020, 1, 1))
+    recent = News.objects.create(
+        title="Новая", text="Т", date=date(2024, 1, 1)
+    )
+
+    response = admin_client.get(
+        export_url("news", "csv"), {"date_from": "2023-01-01"}
+    )
+
+    assert response["Content-Type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(content(response))))
+    assert rows == [
+        ["id", "title", "text", "date", "comment_count"],
+        [str(recent.pk), "Новая", "Т", "2024-01-01", "0"],
+    ]
+
+
+def test_comments_ndjson_day_is_inclusive(admin_client, comment):
+    Comment.objects.filter(pk=comment.pk).update(
+        created=timezone.make_aware(datetime(2024, 1, 1, 23, 30))
+    )
+
+    response = admin_client.get(
+        export_url("comments", "ndjson"),
+        {"date_from": "2024-01-01", "date_to": "2024-01-01"},
+    )
+
+    rows = [json.loads(line) for line in content(response).splitlines()]
+    assert [row["id"] for row in rows] == [comment.pk]
+    assert rows[0]["news_id"] == comment.news_id
+
+
+def test_bad_export_requests(admin_client):
+    assert admin_client.get(
+        export_url("users", "csv")
+    ).status_code == HTTPStatus.NOT_FOUND
+    assert admin_client.get(
+        export_url("news", "csv"),
+        {"date_from": "2024-01-02", "date_to": "2024-01-01"},
+    ).status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_export_command(comment):
+    out = io.StringIO()
+    err = io.StringIO()
+
+    call_command(
+        "export_news", "comments", format="ndjson", stdout=out, stderr=err
+    )
+
+    assert json.loads(out.getvalue())["text"] == comment.text
+    assert "Строк: 1" in err.getvalue()
@@ -0,0 +1,26 @@
+import pytest
+from django.conf import settings
+
+from news.models import Comment, News
+
+pytestmark = pytest.mark.django_db
+
+
+def assert_uses_index(queryset, index_name):
+    plan = queryset.explain()
+    assert index_name in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_home_feed_uses_date_index():
+    queryset = News.objects.order_by("-date", "-pk")
+    assert_uses_index(
+        queryset[:settings.NEWS_COUNT_ON_HOME_PAGE], "news_date_id_idx"
+    )
+
+
+def test_news_comments_use_composite_index(news):
+    queryset = Comment.objects.filter(news=news).order_by("created", "pk")
+    assert_uses_index(
+        queryset[:settings.NEWS_COMMENTS_PER_PAGE], "comment_news_created_idx"
+    )
@@ -0,0 +1,79 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from news.cache import HOME_VERSION_KEY
+from news.ingest import comment_queue
+from news.models import Comment, News
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture(autouse=True)
+def queue_enabled(settings):
+    settings.NEWS_COMMENT_QUEUE = True
+    settings.NEWS_COMMENT_BATCH_WAIT = 0.05
+    yield
+    comment_queue.stop()
+
+
+def test_comment_saved_through_queue(author_client, author, news, detail_url):
+    cache.set(HOME_VERSION_KEY, 1)
+
+    response = author_client.post(detail_url, data={"text": "Из очереди"})
+
+    assert response.status_code == HTTPStatus.FOUND
+    comment = Comment.objects.get()
+    assert (comment.news, comment.author) == (news, author)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    # post_save отправлен, кэш главной сброшен.
+    assert cache.get(HOME_VERSION_KEY) == 2
+
+
+def test_parallel_comments_saved_in_batches(author, news):
+    def submit(number):
+        comment = Comment(news=news, author=author, text=f"Номер {number}")
+        comment_queue.submit(comment, timeout=5)
+
+    threads = [
+        threading.Thread(target=submit, args=(number,)) for number in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert Comment.objects.count() == 20
+    news.refresh_from_db()
+    assert news.comment_count == 20
+
+
+def test_comment_to_missing_news_not_found(author_client):
+    response = author_client.post(
+        reverse("news:detail", args=(0,)), data={"text": "Текст"}
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert not News.objects.exists()
+    assert not Comment.objects.exists()
+
+
+def test_slow_queue_answers_service_unavailable(
+    author_client, news, detail_url, settings
+):
+    settings.NEWS_COMMENT_QUEUE_TIMEOUT = 0.01
+    # Писатель добирает пачку дольше, чем запрос готов ждать.
+    settings.NEWS_COMMENT_BATCH_WAIT = 0.5
+
+    response = author_client.post(detail_url, data={"text": "Не дождался"})
+    comment_queue.stop()
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    # Пачка пропускает комментарий, который перестали ждать.
+    assert not Comment.objects.exists()
+    news.refresh_from_db()
+    assert news.comment_count == 0
@@ -0,0 +1,167 @@
+import asyncio
+import threading
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+from django.urls import reverse
+
+from news import live
+from news.live import DatabaseBroker, LocalBroker
+from news.models import Comment
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def live_url(news):
+    return reverse("news:live", args=(news.pk,))
+
+
+def test_live_needs_asgi(client, live_url):
+    response = client.get(live_url)
+    assert response.status_code == HTTPStatus.NOT_IMPLEMENTED
+
+
+def test_live_missing_news_not_found():
+    response = async_to_sync(AsyncClient().get)(
+        reverse("news:live", args=(0,))
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_live_pushes_new_comment(
+    live_url, news, author, django_capture_on_commit_callbacks
+):
+    def create_comment():
+        with django_capture_on_commit_callbacks(execute=True):
+            Comment.objects.create(news=news, author=author, text="Свежий")
+
+    async def read():
+        response = await AsyncClient().get(live_url)
+        assert response["Content-Type"] == "text/event-stream"
+        events = aiter(response.streaming_content)
+        assert await anext(events) == b"retry: 5000\n\n"
+        await sync_to_async(create_comment)()
+        return await asyncio.wait_for(anext(events), 1)
+
+    event = async_to_sync(read)().decode()
+
+    comment = Comment.objects.get()
+    assert event.startswith(f"id: {comment.pk}\nevent: comment\n")
+    assert '"text": "Свежий"' in event
+    assert '"author": "author"' in event
+
+
+def test_live_replays_missed_comments(live_url, news, author):
+    first, second = (
+        Comment.objects.create(news=news, author=author, text=text)
+        for text in ("Первый", "Второй")
+    )
+
+    async def read():
+        response = await AsyncClient().get(
+            live_url, headers={"Last-Event-ID": str(first.pk)}
+        )
+        events = aiter(response.streaming_content)
+        await anext(events)
+        return await anext(events)
+
+    event = async_to_sync(read)().decode()
+    assert event.startswith(f"id: {second.pk}\n")
+
+
+def test_live_replays_more_than_queue_size(settings, live_url, news, author):
+    settings.NEWS_LIVE_QUEUE_SIZE = 2
+    comments = Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f"Комментарий {index}")
+        for index in range(6)
+    )
+
+    async def read():
+        response = await AsyncClient().get(
+            live_url, headers={"Last-Event-ID": str(comments[0].pk)}
+        )
+        events = aiter(response.streaming_content)
+        await anext(events)
+        return [await anext(events) for _ in comments[1:]]
+
+    events = async_to_sync(read)()
+    assert [int(event.split()[1]) for event in events] == [
+        comment.pk for comment in comments[1:]
+    ]
+
+
+def test_idle_subscribers_hold_no_threads():
+    broker = LocalBroker()
+
+    async def run():
+        received = []
+
+        async def listen():
+            async with broker.subscribe(1) as queue:
+                received.append(await queue.get())
+
+        threads = threading.active_count()
+        tasks = [asyncio.create_task(listen()) for _ in range(2000)]
+        await asyncio.sleep(0)
+        assert threading.active_count() <= threads
+        # Сигналы публикуют из потоков запросов, не из цикла событий.
+        publisher = threading.Thread(
+            target=broker.publish, args=(1, {"id": 1})
+        )
+        publisher.start()
+        await asyncio.gather(*tasks)
+        publisher.join()
+        return received
+
+    received = async_to_sync(run)()
+    assert len(received) == 2000
+    assert broker.channels() == []
+
+
+def test_database_broker_polls_new_comments(settings, news, author):
+    settings.NEWS_LIVE_POLL_INTERVAL = 0.01
+    broker = DatabaseBroker()
+
+    async def run():
+        async with broker.subscribe(news.pk) as queue:
+            await asyncio.sleep(0.05)
+            comment = await Comment.objects.acreate(
+                news=news, author=author, text="Из другого процесса"
+            )
+            message = await asyncio.wait_for(queue.get(), 1)
+        return comment, message
+
+    comment, message = async_to_sync(run)()
+    assert message["id"] == comment.pk
+    assert message["author"] == "author"
+
+
+def test_database_broker_survives_failed_poll(settings, caplog, news, author):
+    settings.NEWS_LIVE_POLL_INTERVAL = 0.01
+    broker = DatabaseBroker()
+    failures = [RuntimeError("database is locked")]
+
+    def flaky_message(*args):
+        if failures:
+            raise failures.pop()
+        return message(*args)
+
+    message = live.comment_message
+
+    async def run():
+        async with broker.subscribe(news.pk) as queue:
+            await asyncio.sleep(0.05)
+            with mock.patch.object(live, "comment_message", flaky_message):
+                comment = await Comment.objects.acreate(
+                    news=news, author=author, text="После сбоя"
+                )
+                received = await asyncio.wait_for(queue.get(), 1)
+        return comment, received
+
+    comment, received = async_to_sync(run)()
+    assert received["id"] == comment.pk
+    assert "Не удалось получить новые комментарии" in caplog.text
@@ -1,10 +1,14 @@
+import io
+import os
 from http import HTTPStatus
 
 import pytest
+from django.core.management import call_command
+from django.urls import reverse
 from pytest_django.asserts import assertRedirects
 
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.models import Comment, News
 
 pytestmark = pytest.mark.django_db
 
@@ -36,6 +40,8 @@ def test_auth_can_create_comment(author_client, author, news, detail_url):
     assert created.text == COMMENT_TEXT
     assert created.author == author
     assert created.news == news
+    news.refresh_from_db()
+    assert news.comment_count == 1
 
 
 @pytest.mark.parametrize("bad_word", BAD_WORDS)
@@ -54,6 +60,56 @@ def test_bad_words_block_comment(author_client, detail_url, bad_word):
     assert WARNING in form.errors["text"][0]
 
 
+@pytest.mark.parametrize(
+    "bad_text",
+    (
+        "р е д и с к а",
+        "Р.Е.Д.И.С.К.А",
+        "pедиcкa",
+        "НЕГОДЯЙ!",
+    ),
+)
+def test_disguised_bad_words_block_comment(
+    author_client, detail_url, bad_text
+):
+    response = author_client.post(detail_url, data={"text": bad_text})
+
+    assert response.status_code == HTTPStatus.OK
+    assert Comment.objects.count() == 0
+    assert WARNING in response.context["form"].errors["text"][0]
+
+
+@pytest.mark.parametrize(
+    "text",
+    (
+        "На ужин редис, каша и чай",
+        "Он был негод. Яйца тоже",
+        "Редис к ужину",
+    ),
+)
+def test_bad_word_across_words_allowed(author_client, detail_url, text):
+    response = author_client.post(detail_url, data={"text": text})
+
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.get().text == text
+
+
+def test_bad_words_file_reloaded(
+    author_client, detail_url, settings, tmp_path
+):
+    words_file = tmp_path / "bad_words.txt"
+    words_file.write_text("# свой список\n", encoding="utf-8")
+    settings.NEWS_BAD_WORDS_FILE = str(words_file)
+    response = author_client.post(detail_url, data={"text": "бармаглот"})
+    assert response.status_code == HTTPStatus.FOUND
+
+    words_file.write_text("бармаглот\n", encoding="utf-8")
+    os.utime(words_file, ns=(0, 10**18))
+    response = author_client.post(detail_url, data={"text": "Бармаглот"})
+    assert response.status_code == HTTPStatus.OK
+    assert WARNING in response.context["form"].errors["text"][0]
+
+
 def test_author_can_edit_own_comment(author_client, edit_url, comment):
     old_author = comment.author
     old_news = comment.news
@@ -67,12 +123,24 @@ def test_author_can_edit_own_comment(author_client, edit_url, comment):
     assert updated.news == old_news
 
 
-def test_author_can_delete_own_comment(author_client, delete_url):
+def test_author_can_delete_own_comment(author_client, delete_url, news):
     before = Comment.objects.count()
+    News.objects.filter(pk=news.pk).update(comment_count=before)
 
     response = author_client.post(delete_url)
     assert response.status_code == HTTPStatus.FOUND
     assert Comment.objects.count() == before - 1
+    news.refresh_from_db()
+    assert news.comment_count == before - 1
+
+
+def test_reconcile_comment_count(news, comments_list):
+    News.objects.update(comment_count=100)
+
+    call_command("reconcile_comment_count")
+
+    news.refresh_from_db()
+    assert news.comment_count == Comment.objects.filter(news=news).count()
 
 
 def test_user_cant_edit_foreign_comment(reader_client, edit_url, comment):
@@ -95,3 +163,69 @@ def test_user_cant_delete_foreign_comment(reader_client, delete_url):
     response = reader_client.post(delete_url)
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert Comment.objects.count() == before
+
+
+# Сессия клиента уже в кэше, а пользователь после входа читается из
+# базы на первом запросе. transaction.atomic() внутри теста добавляет
+# SAVEPOINT и RELEASE SAVEPOINT.
+AUTH_QUERIES = 1
+ATOMIC_QUERIES = 2
+
+
+def test_create_comment_queries(
+    author_client, detail_url, django_assert_num_queries
+):
+    # UPDATE счётчика и INSERT комментария.
+    with django_assert_num_queries(AUTH_QUERIES + ATOMIC_QUERIES + 2):
+        response = author_client.post(detail_url, data={"text": NEW_TEXT})
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_edit_comment_queries(
+    author_client, edit_url, django_assert_num_queries
+):
+    # SELECT комментария и UPDATE.
+    with django_assert_num_queries(AUTH_QUERIES + 2):
+        response = author_client.post(edit_url, data={"text": NEW_TEXT})
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_delete_comment_queries(
+    author_client, delete_url, django_assert_num_queries
+):
+    # SELECT комментария, DELETE и UPDATE счётчика.
+    with django_assert_num_queries(AUTH_QUERIES + ATOMIC_QUERIES + 3):
+        response = author_client.post(delete_url)
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_comment_to_missing_news_not_found(author_client):
+    response = author_client.post(
+        reverse("news:detail", args=(0,)), data={"text": NEW_TEXT}
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert Comment.objects.count() == 0
+
+
+def test_seed_news_builds_consistent_dataset(django_user_model):
+    call_command(
+        "seed_news", users=5, news=20, comments=200, batch_size=50,
+        stdout=io.StringIO(),
+    )
+
+    assert django_user_model.objects.count() == 5
+    assert News.objects.count() == 20
+    assert Comment.objects.count() == 200
+    counts = News.objects.values_list("comment_count", flat=True)
+    assert sum(counts) == 200
+    # Свежие новости обсуждают больше старых.
+    newest, oldest = News.objects.first(), News.objects.last()
+    assert newest.comment_count > oldest.comment_count
+
+
+def test_seed_news_skips_taken_usernames(django_user_model):
+    django_user_model.objects.create(username="user1")
+    call_command("seed_news", users=2, news=0, stdout=io.StringIO())
+    assert set(
+        django_user_model.objects.values_list("username", flat=True)
+    ) == {"user1", "user2", "user3"}
@@ -0,0 +1,120 @@
+import sqlite3
+import time
+from contextlib import closing
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from news.cache import HOME_CHANGED_KEY, invalidate_home_cache
+from news.models import News
+from news.replica import (
+    PRIMARY,
+    REPLICA,
+    STICKY_COOKIE,
+    ReplicaRouter,
+    StickyPrimaryMiddleware,
+    copy_database,
+    primary_reads_since,
+)
+
+router = ReplicaRouter()
+
+
+def handle(write=False):
+    """Middleware с view, которая запоминает, откуда она читала."""
+    seen = []
+
+    def view(request):
+        if write:
+            router.db_for_write(News)
+        seen.append(router.db_for_read(News))
+        return HttpResponse()
+
+    return StickyPrimaryMiddleware(view), seen
+
+
+def test_reads_go_to_replica():
+    middleware, seen = handle()
+
+    response = middleware(RequestFactory().get("/"))
+
+    assert seen == [REPLICA]
+    assert STICKY_COOKIE not in response.cookies
+
+
+def test_write_sticks_client_to_primary(settings):
+    settings.NEWS_PRIMARY_STICKY_SECONDS = 30
+    middleware, seen = handle(write=True)
+
+    response = middleware(RequestFactory().post("/"))
+
+    assert seen == [PRIMARY]
+    assert response.cookies[STICKY_COOKIE]["max-age"] == 30
+    assert router.db_for_read(News) == REPLICA
+
+
+def test_sticky_client_reads_primary():
+    middleware, seen = handle()
+    request = RequestFactory().get("/")
+    request.COOKIES[STICKY_COOKIE] = "1"
+
+    middleware(request)
+
+    assert seen == [PRIMARY]
+
+
+def test_async_write_sticks_client_to_primary():
+    seen = []
+
+    async def view(request):
+        router.db_for_write(News)
+        seen.append(router.db_for_read(News))
+        return HttpResponse()
+
+    middleware = StickyPrimaryMiddleware(view)
+    assert iscoroutinefunction(middleware)
+
+    response = async_to_sync(middleware)(RequestFactory().post("/"))
+
+    assert seen == [PRIMARY]
+    assert STICKY_COOKIE in response.cookies
+    assert router.db_for_read(News) == REPLICA
+
+
+def test_fresh_changes_read_from_primary(settings):
+    settings.NEWS_PRIMARY_STICKY_SECONDS = 10
+    with primary_reads_since(time.time()):
+        assert router.db_for_read(News) == PRIMARY
+    assert router.db_for_read(News) == REPLICA
+
+    for changed in (None, time.time() - 11):
+        with primary_reads_since(changed):
+            assert router.db_for_read(News) == REPLICA
+
+
+def test_home_invalidation_records_time():
+    before = time.time()
+    invalidate_home_cache()
+    assert cache.get(HOME_CHANGED_KEY) >= before
+
+
+def test_migrations_only_on_primary():
+    assert router.allow_migrate(PRIMARY, "news")
+    assert not router.allow_migrate(REPLICA, "news")
+
+
+def test_copy_database(tmp_path):
+    primary = tmp_path / "primary.sqlite3"
+    replica = tmp_path / "replica.sqlite3"
+    with closing(sqlite3.connect(primary)) as connection:
+        connection.execute("CREATE TABLE news (title TEXT)")
+        connection.execute("INSERT INTO news VALUES ('Заголовок')")
+        connection.commit()
+
+    copy_database(primary, replica)
+
+    with closing(sqlite3.connect(replica)) as connection:
+        rows = connection.execute("SELECT title FROM news").fetchall()
+    assert rows == [("Заголовок",)]
@@ -1,9 +1,12 @@
 from http import HTTPStatus
 
 import pytest
+from django.urls import reverse
 from pytest_django.asserts import assertRedirects
 from pytest_lazyfixture import lazy_fixture as lf
 
+from news.models import News
+
 pytestmark = pytest.mark.django_db
 
 
@@ -12,6 +15,7 @@ pytestmark = pytest.mark.django_db
     (
         ("home_url", lf("client"), HTTPStatus.OK),
         ("detail_url", lf("client"), HTTPStatus.OK),
+        ("search_url", lf("client"), HTTPStatus.OK),
         ("login_url", lf("client"), HTTPStatus.OK),
         ("signup_url", lf("client"), HTTPStatus.OK),
         ("edit_url", lf("author_client"), HTTPStatus.OK),
@@ -42,3 +46,51 @@ def test_anon_redirected_to_login(
     expected = f"{login_url}?next={url}"
     response = client.get(url)
     assertRedirects(response, expected)
+
+
+def test_detail_not_modified_until_comment_added(
+    client, detail_url, author, news
+):
+    etag = client.get(detail_url)["ETag"]
+
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    news.comment_set.create(author=author, text="Новый")
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_detail_etag_changes_on_comment_edit(
+    client, detail_url, comment, django_capture_on_commit_callbacks
+):
+    etag = client.get(detail_url)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        comment.text = "Исправленный текст"
+        comment.save()
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_detail_etag_ignores_other_news(
+    client, detail_url, author, django_capture_on_commit_callbacks
+):
+    etag = client.get(detail_url)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        other = News.objects.create(title="Другая", text="Текст")
+        other.comment_set.create(author=author, text="Новый")
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_detail_etag_differs_per_user(client, author_client, detail_url):
+    etag = client.get(detail_url)["ETag"]
+    response = author_client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_missing_news_not_found(client):
+    response = client.get(reverse("news:detail", args=(0,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,138 @@
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from news.models import Comment, News
+from news.search import search_news, to_match_query
+
+pytestmark = pytest.mark.django_db
+
+
+def found(client, search_url, **params):
+    response = client.get(search_url, params)
+    return [hit.pk for hit in response.context["object_list"]]
+
+
+def test_title_match_ranked_above_text_match(client, search_url):
+    in_text = News.objects.create(title="Погода", text="Ожидается гроза")
+    in_title = News.objects.create(title="Гроза", text="Ветер и дождь")
+    assert found(client, search_url, q="гроз") == [in_title.pk, in_text.pk]
+
+
+def test_matches_are_highlighted_and_escaped():
+    News.objects.create(title="<b>Гроза</b> в городе", text="Гроза")
+    hit, = search_news("гроза", 10)
+    assert hit.title == "&lt;b&gt;<mark>Гроза</mark>&lt;/b&gt; в городе"
+    assert hit.snippet == "<mark>Гроза</mark>"
+
+
+def test_frequent_term_ranks_newest_candidates(settings):
+    settings.NEWS_SEARCH_CANDIDATES = 2
+    News.objects.create(title="Гроза", text="")
+    newer = [
+        News.objects.create(title="Погода", text="Гроза").pk
+        for _ in range(2)
+    ]
+    results = search_news("гроза", 10)
+    assert sorted(hit.pk for hit in results) == newer
+    assert results.recent_only
+    assert not search_news("погода", 10).recent_only
+
+
+def test_recent_candidates_rank_title_matches_first(settings):
+    settings.NEWS_SEARCH_CANDIDATES = 2
+    News.objects.create(title="Гроза", text="")
+    in_title = News.objects.create(title="Гроза", text="")
+    in_text = News.objects.create(title="Погода", text="Гроза")
+    assert [hit.pk for hit in search_news("гроза", 10)] == [
+        in_title.pk, in_text.pk
+    ]
+
+
+def test_frequent_word_only_filters_matches(settings):
+    settings.NEWS_SEARCH_FREQUENT = 2
+    for _ in range(3):
+        News.objects.create(title="Погода", text="")
+    News.objects.create(title="Гроза", text="")
+    in_text = News.objects.create(title="Погода", text="Гроза")
+    in_title = News.objects.create(title="Погода: гроза", text="")
+    results = search_news("погода гроза", 10)
+    assert [hit.pk for hit in results] == [in_title.pk, in_text.pk]
+    assert not results.recent_only
+
+
+def test_only_frequent_words_rank_title_matches_first(settings):
+    settings.NEWS_SEARCH_FREQUENT = 1
+    in_title = News.objects.create(title="Гроза", text="Погода")
+    in_text = News.objects.create(title="Ветер", text="Погода, гроза")
+    assert [hit.pk for hit in search_news("погода гроза", 10)] == [
+        in_title.pk, in_text.pk
+    ]
+
+
+def test_recency_limit_stated_on_page(settings, client, search_url):
+    settings.NEWS_SEARCH_CANDIDATES = 1
+    for _ in range(2):
+        News.objects.create(title="Гроза", text="")
+    response = client.get(search_url, {"q": "гроза"})
+    assert "1 самых свежих" in response.content.decode()
+
+
+def test_date_range_filter(client, search_url):
+    News.objects.create(title="Гроза", text="", date=date(2020, 5, 1))
+    recent = News.objects.create(title="Гроза", text="", date=date(2024, 5, 1))
+    assert found(
+        client, search_url, q="гроза", date_from="2024-01-01"
+    ) == [recent.pk]
+
+    response = client.get(
+        search_url,
+        {"q": "гроза", "date_from": "2024-01-01", "date_to": "2023-01-01"},
+    )
+    assert response.context["form"].errors
+    assert list(response.context["object_list"]) == []
+
+
+def test_comments_searched_after_news(author, news):
+    by_title = News.objects.create(title="Гроза", text="")
+    Comment.objects.create(news=news, author=author, text="Была гроза")
+    hits = search_news("гроза", 10, comments=True)
+    assert [hit.pk for hit in hits] == [by_title.pk, news.pk]
+    assert hits[1].in_comments
+    assert [hit.pk for hit in search_news("гроза", 10)] == [by_title.pk]
+
+
+def test_index_follows_update_and_delete(news):
+    News.objects.filter(pk=news.pk).update(title="Переименованная")
+    assert search_news("заголовок", 10) == []
+    assert [hit.pk for hit in search_news("переименованная", 10)] == [
+        news.pk
+    ]
+
+    news.delete()
+    assert search_news("переименованная", 10) == []
+
+
+def test_query_syntax_is_escaped(client, search_url, news):
+    assert to_match_query('текст" OR (*') == '"текст" "OR"*'
+    assert found(client, search_url, q='"заголовок" (') == [news.pk]
+
+
+def test_long_prefix_cut_to_indexed_length():
+    assert to_match_query('новость заголовок') == '"новость" "заголо"*'
+
+
+def test_rebuild_command_restores_index(comment):
+    with connection.cursor() as cursor:
+        for table in ("news_news_fts", "news_comment_fts"):
+            cursor.execute(
+                f"INSERT INTO {table}({table}) VALUES ('delete-all')"
+            )
+    assert search_news("комментарий", 10, comments=True) == []
+
+    call_command("rebuild_news_search", batch_size=1)
+
+    hits = search_news("комментарий", 10, comments=True)
+    assert [hit.pk for hit in hits] == [comment.news_id]
@@ -0,0 +1,30 @@
+import pytest
+from django.db import connection
+
+pytestmark = pytest.mark.django_db
+
+
+def pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+@pytest.fixture
+def new_connection():
+    wrapper = connection.copy()
+    yield wrapper
+    wrapper.close()
+
+
+def test_pragmas_applied_to_new_connection(settings, new_connection):
+    settings.NEWS_SQLITE_PRAGMAS = {"cache_size": -1234, "busy_timeout": 321}
+
+    assert pragma(new_connection, "cache_size") == -1234
+    assert pragma(new_connection, "busy_timeout") == 321
+
+
+def test_no_pragmas_by_default(new_connection):
+    assert pragma(new_connection, "cache_size") == pragma(
+        connection, "cache_size"
+    )
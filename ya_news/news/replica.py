@@ -0,0 +1,124 @@
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+STICKY_COOKIE = 'use_primary'
+
+# Читать ли с основной базы: клиент недавно писал или пишет сейчас.
+read_primary = ContextVar('read_primary', default=False)
+# Была ли запись в текущем запросе.
+written = ContextVar('written', default=False)
+
+
+class ReplicaRouter:
+    """
+    Чтение с реплики, запись в основную базу.
+
+    После первой записи чтение тоже идёт с основной базы, иначе код
+    не увидел бы собственных изменений, пока реплика их не получила.
+    """
+
+    def db_for_read(self, model, **hints):
+        return PRIMARY if read_primary.get() else REPLICA
+
+    def db_for_write(self, model, **hints):
+        read_primary.set(True)
+        written.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схему реплика получает вместе с данными при копировании.
+        return db == PRIMARY
+
+
+@contextmanager
+def primary_reads_since(changed):
+    """
+    Внутри блока читать с основной базы, если данные менялись позже,
+    чем NEWS_PRIMARY_STICKY_SECONDS назад.
+
+    Для страниц, которые кэшируются для всех: реплика могла ещё не
+    получить изменение, и собранная с неё страница легла бы в кэш под
+    новой версией как свежая. changed — время по time.time() или None.
+    """
+    recent = changed is not None and (
+        time.time() - changed < settings.NEWS_PRIMARY_STICKY_SECONDS
+    )
+    token = read_primary.set(True) if recent else None
+    try:
+        yield
+    finally:
+        if token is not None:
+            read_primary.reset(token)
+
+
+class StickyPrimaryMiddleware:
+    """
+    Направляет чтение клиента на основную базу, пока реплика отстаёт.
+
+    Если при обработке запроса была запись, клиент получает куку на
+    NEWS_PRIMARY_STICKY_SECONDS, и до её истечения все его запросы
+    читают с основной базы: после комментария или правки он сразу видит
+    результат. Ставится до SessionMiddleware, чтобы учитывать и сессии.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sticky = read_primary.set(STICKY_COOKIE in request.COOKIES)
+        wrote = written.set(False)
+        try:
+            return self.stick(self.get_response(request))
+        finally:
+            # Поток обслуживает и другие запросы, флаги не должны утечь.
+            read_primary.reset(sticky)
+            written.reset(wrote)
+
+    async def __acall__(self, request):
+        sticky = read_primary.set(STICKY_COOKIE in request.COOKIES)
+        wrote = written.set(False)
+        try:
+            return self.stick(await self.get_response(request))
+        finally:
+            read_primary.reset(sticky)
+            written.reset(wrote)
+
+    def stick(self, response):
+        if written.get():
+            response.set_cookie(
+                STICKY_COOKIE,
+                '1',
+                max_age=settings.NEWS_PRIMARY_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+def copy_database(source, target, pages=-1):
+    """
+    Копирует SQLite-базу source в target через backup API.
+
+    Копия — согласованный снимок, запись в source при этом не
+    останавливается. pages — сколько страниц копировать за шаг.
+    """
+    with closing(sqlite3.connect(source)) as src:
+        with closing(sqlite3.connect(target)) as dst:
+            src.backup(dst, pages=pages)
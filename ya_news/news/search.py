@@ -0,0 +1,381 @@
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Comment, News
+
+TERMS = re.compile(r'\w+')
+# Границы подсветки: символы из области для частного использования,
+# которых не бывает в тексте. После экранирования HTML они
+# заменяются на теги <mark>.
+MARK_START = '\ue000'
+MARK_END = '\ue001'
+SNIPPET_TOKENS = 24
+# Совпадение в заголовке новости весит больше, чем в тексте.
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+# Самый длинный префикс, для которого в индексе есть готовые списки
+# документов (prefix в миграции 0004_news_search).
+PREFIX_LENGTH = 6
+
+
+class Index:
+    """Полнотекстовый индекс FTS5 с внешним содержимым из model."""
+
+    def __init__(self, table, model, columns):
+        self.table = table
+        self.model = model
+        self.columns = columns
+
+    def command(self, cursor, name):
+        cursor.execute(
+            f'INSERT INTO {self.table}({self.table}) VALUES (%s)', [name]
+        )
+
+    def rebuild(self, batch_size, progress=None):
+        """
+        Пересобирает индекс, читая таблицу пачками по первичному ключу.
+
+        Очистка и все пачки идут в одной транзакции: триггеры, которые
+        держат индекс в актуальном состоянии, иначе успели бы добавить или
+        удалить строки между пачками, и часть из них попала бы в индекс
+        дважды или не попала бы вовсе. Запись в базу на время пересборки
+        ждёт её окончания, поиск до коммита видит старый индекс. Пачки
+        нужны только для отчёта о ходе работы. Возвращает число
+        проиндексированных строк.
+        """
+        names = ', '.join(self.columns)
+        source = self.model._meta.db_table
+        done = 0
+        last_pk = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            self.command(cursor, 'delete-all')
+            while True:
+                pks = list(
+                    self.model.objects.filter(pk__gt=last_pk)
+                    .order_by('pk')
+                    .values_list('pk', flat=True)[:batch_size]
+                )
+                if not pks:
+                    break
+                cursor.execute(
+                    f'INSERT INTO {self.table}(rowid, {names}) '
+                    f'SELECT id, {names} FROM {source} '
+                    'WHERE id BETWEEN %s AND %s',
+                    [pks[0], pks[-1]],
+                )
+                done += len(pks)
+                last_pk = pks[-1]
+                if progress is not None:
+                    progress(done)
+        with connection.cursor() as cursor:
+            self.command(cursor, 'optimize')
+        return done
+
+
+NEWS_INDEX = Index('news_news_fts', News, ('title', 'text'))
+COMMENT_INDEX = Index('news_comment_fts', Comment, ('text',))
+INDEXES = {'news': NEWS_INDEX, 'comments': COMMENT_INDEX}
+
+# Поиск идёт в два запроса: первый только ранжирует совпадения, второй
+# подсвечивает найденное. Иначе snippet() считался бы для каждого
+# кандидата, а не только для показанных.
+NEWS_FROM = """
+    FROM news_news_fts
+    JOIN news_news AS news ON news.id = news_news_fts.rowid
+    WHERE news_news_fts MATCH %s {dates} {frequent}
+"""
+NEWS_RANK_SQL = """
+    SELECT news.id, {score} AS score
+    {source} {bound}
+    ORDER BY score, news.id DESC
+    LIMIT %s
+"""
+NEWS_MARK_SQL = f"""
+    SELECT news.id, news.date,
+        highlight(news_news_fts, 0, %s, %s),
+        snippet(news_news_fts, 1, %s, %s, '…', {SNIPPET_TOKENS})
+    FROM news_news_fts
+    JOIN news_news AS news ON news.id = news_news_fts.rowid
+    WHERE news_news_fts MATCH %s AND news_news_fts.rowid IN ({{ids}})
+"""
+COMMENT_FROM = """
+    FROM news_comment_fts
+    JOIN news_comment AS comment ON comment.id = news_comment_fts.rowid
+    JOIN news_news AS news ON news.id = comment.news_id
+    WHERE news_comment_fts MATCH %s {dates} {frequent}
+"""
+COMMENT_RANK_SQL = """
+    SELECT comment.id, comment.news_id, {score} AS score
+    {source} {bound}
+    ORDER BY score, comment.id DESC
+    LIMIT %s
+"""
+COMMENT_MARK_SQL = f"""
+    SELECT rowid,
+        snippet(news_comment_fts, 0, %s, %s, '…', {SNIPPET_TOKENS})
+    FROM news_comment_fts
+    WHERE news_comment_fts MATCH %s AND rowid IN ({{ids}})
+"""
+# Оценки релевантности: меньше — выше. bm25 на каждый запрос читает
+# список документов со словом целиком, чтобы посчитать его редкость, и
+# для слова из каждой новости это сотни миллисекунд. Поэтому, когда
+# кандидатов ограничивает NEWS_SEARCH_CANDIDATES, свежие совпадения
+# ранжируются проще: сначала новости со словом в заголовке. Частые
+# слова (см. frequent_phrases) в bm25 не передаются вовсе.
+NEWS_SCORE = f'bm25(news_news_fts, {TITLE_WEIGHT}, {TEXT_WEIGHT})'
+NEWS_RECENT_SCORE = (
+    f'-(instr(highlight(news_news_fts, 0, char({ord(MARK_START)}), '
+    f"''), char({ord(MARK_START)})) > 0)"
+)
+COMMENT_SCORE = 'bm25(news_comment_fts)'
+COMMENT_RECENT_SCORE = '0'
+# rowid самого старого из кандидатов и следующего за ним, если он есть:
+# FTS5 отдаёт совпадения в порядке rowid без подсчёта релевантности.
+BOUND_SQL = """
+    SELECT {table}.rowid {source}
+    ORDER BY {table}.rowid DESC
+    LIMIT 2 OFFSET %s
+"""
+# Есть ли у фразы больше NEWS_SEARCH_FREQUENT совпадений, по подзапросу
+# на каждую фразу.
+FREQUENT_SQL = """
+    (SELECT rowid FROM {table} WHERE {table} MATCH %s
+    LIMIT 1 OFFSET %s) IS NOT NULL
+"""
+# Частые слова только отбирают строки: совпадения с полным запросом
+# проверяются по списку rowid, а не поиском для каждой строки.
+FREQUENT_FILTER_SQL = """
+    AND +{table}.rowid IN (SELECT rowid FROM {table} WHERE {table} MATCH %s)
+"""
+
+
+def to_match_query(query):
+    """
+    Запрос пользователя в синтаксисе FTS5.
+
+    Каждое слово берётся в кавычки, поэтому операторы и скобки из
+    запроса не ломают поиск. Последнее слово ищется как префикс, пока
+    его дописывают, и обрезается до PREFIX_LENGTH символов: более
+    длинные префиксы в индексе не хранятся, их поиск строит список
+    документов в памяти, и для частых слов это занимает секунды.
+    Слова объединяются через AND. Если слов нет, None.
+    """
+    phrases = match_phrases(query)
+    return ' '.join(phrases) if phrases else None
+
+
+def match_phrases(query):
+    """Фразы FTS5 для каждого слова запроса (см. to_match_query)."""
+    terms = TERMS.findall(query)
+    if not terms:
+        return []
+    *words, last = terms
+    return [*(f'"{word}"' for word in words), f'"{last[:PREFIX_LENGTH]}"*']
+
+
+def mark(text):
+    """Экранирует текст и превращает границы подсветки в <mark>."""
+    return mark_safe(
+        escape(text)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def candidates_bound(cursor, table, source, params):
+    """
+    Условие, оставляющее для ранжирования только NEWS_SEARCH_CANDIDATES
+    самых свежих совпадений (с наибольшим rowid), и его параметры.
+
+    bm25 читает размеры документа для каждой подошедшей строки, и слово,
+    которое есть в каждой новости, ранжировалось бы секундами. Если
+    совпадений не больше, ограничения нет.
+    """
+    cursor.execute(
+        BOUND_SQL.format(table=table, source=source),
+        [*params, settings.NEWS_SEARCH_CANDIDATES - 1],
+    )
+    rows = cursor.fetchall()
+    if len(rows) < 2:
+        return '', []
+    return f'AND {table}.rowid >= %s', [rows[0][0]]
+
+
+def frequent_phrases(cursor, table, phrases):
+    """
+    Фразы, у которых больше NEWS_SEARCH_FREQUENT совпадений во всей
+    таблице.
+
+    bm25 на каждый запрос читает список документов каждой фразы целиком,
+    чтобы посчитать её редкость, и слово из каждой новости стоит ему
+    десятков миллисекунд. Вес такого слова близок к нулю, а в каждом
+    найденном документе оно есть, поэтому на порядок оно почти не влияет.
+    Проверка читает не больше NEWS_SEARCH_FREQUENT строк на фразу.
+    """
+    probe = FREQUENT_SQL.format(table=table)
+    cursor.execute(
+        'SELECT ' + ', '.join([probe] * len(phrases)),
+        [
+            param
+            for phrase in phrases
+            for param in (phrase, settings.NEWS_SEARCH_FREQUENT)
+        ],
+    )
+    return {
+        phrase
+        for phrase, frequent in zip(phrases, cursor.fetchone())
+        if frequent
+    }
+
+
+def date_filter(date_from, date_to):
+    sql = ''
+    params = []
+    if date_from is not None:
+        sql += ' AND news.date >= %s'
+        params.append(date_from)
+    if date_to is not None:
+        sql += ' AND news.date <= %s'
+        params.append(date_to)
+    return sql, params
+
+
+class SearchHit:
+    """Найденная новость с подсвеченными заголовком и фрагментом."""
+
+    def __init__(self, pk, date, title, snippet, score, in_comments=False):
+        self.pk = pk
+        self.date = date
+        self.title = title
+        self.snippet = snippet
+        self.score = score
+        self.in_comments = in_comments
+
+
+class SearchResults(list):
+    """
+    Найденные новости. recent_only — совпадений больше, чем
+    NEWS_SEARCH_CANDIDATES, и по релевантности ранжировались только
+    самые свежие из них: более старые новости находятся с периодом.
+    """
+    recent_only = False
+
+
+def search_news(query, limit, date_from=None, date_to=None, comments=False):
+    """
+    Новости, подходящие под запрос, от самых релевантных.
+
+    Если comments, ищем и в комментариях: новость, которая нашлась только
+    по комментарию, показывается с фрагментом этого комментария. Такие
+    новости идут после найденных по заголовку и тексту.
+    """
+    results = SearchResults()
+    phrases = match_phrases(query)
+    if not phrases:
+        return results
+    match = ' '.join(phrases)
+    dates, date_params = date_filter(date_from, date_to)
+    marks = [MARK_START, MARK_END]
+    with connection.cursor() as cursor:
+        ranked, results.recent_only = rank(
+            cursor, 'news_news_fts', NEWS_FROM, NEWS_RANK_SQL,
+            (NEWS_SCORE, NEWS_RECENT_SCORE),
+            phrases, dates, date_params, limit,
+        )
+        hits = {}
+        if ranked:
+            ids = [pk for pk, _ in ranked]
+            cursor.execute(
+                NEWS_MARK_SQL.format(ids=placeholders(ids)),
+                [*marks, *marks, match, *ids],
+            )
+            marked = {pk: rest for pk, *rest in cursor.fetchall()}
+            for pk, score in ranked:
+                date, title, snippet = marked[pk]
+                hits[pk] = SearchHit(
+                    pk, date, mark(title), mark(snippet), score
+                )
+        if not comments or len(hits) >= limit:
+            results.extend(hits.values())
+            return results
+        ranked, recent_only = rank(
+            cursor, 'news_comment_fts', COMMENT_FROM, COMMENT_RANK_SQL,
+            (COMMENT_SCORE, COMMENT_RECENT_SCORE),
+            phrases, dates, date_params, limit,
+        )
+        results.recent_only = results.recent_only or recent_only
+        # Новость показывается с лучшим из подошедших комментариев.
+        best = {}
+        for pk, news_id, score in ranked:
+            if news_id not in hits and news_id not in best:
+                best[news_id] = (pk, score)
+        snippets = {}
+        if best:
+            ids = [pk for pk, _ in best.values()]
+            cursor.execute(
+                COMMENT_MARK_SQL.format(ids=placeholders(ids)),
+                [*marks, match, *ids],
+            )
+            snippets = dict(cursor.fetchall())
+    found = News.objects.only('title', 'date').in_bulk(best)
+    extra = [
+        SearchHit(
+            news_id,
+            found[news_id].date,
+            escape(found[news_id].title),
+            mark(snippets[pk]),
+            score,
+            in_comments=True,
+        )
+        for news_id, (pk, score) in best.items()
+    ]
+    results.extend([*hits.values(), *extra][:limit])
+    return results
+
+
+def rank(cursor, table, source, sql, scores, phrases, dates, params, limit):
+    """
+    Строки sql с лучшими совпадениями по порядку и признак того, что
+    ранжировались только NEWS_SEARCH_CANDIDATES самых свежих: тогда
+    вместо первой оценки из scores берётся вторая.
+
+    Иначе bm25 считается только по редким фразам, а частые лишь
+    отбирают строки. Если редких фраз нет, совпадений не больше
+    NEWS_SEARCH_CANDIDATES, и они тоже ранжируются второй оценкой.
+    """
+    match = ' '.join(phrases)
+    bound, bound_params = candidates_bound(
+        cursor, table, source.format(dates=dates, frequent=''),
+        [match, *params],
+    )
+    score, recent_score = scores
+    frequent = ''
+    frequent_params = []
+    if bound:
+        score = recent_score
+    else:
+        found = frequent_phrases(cursor, table, phrases)
+        rare = [phrase for phrase in phrases if phrase not in found]
+        if not rare:
+            score = recent_score
+        elif found:
+            frequent = FREQUENT_FILTER_SQL.format(table=table)
+            frequent_params = [match]
+            match = ' '.join(rare)
+    cursor.execute(
+        sql.format(
+            source=source.format(dates=dates, frequent=frequent),
+            bound=bound,
+            score=score,
+        ),
+        [match, *params, *frequent_params, *bound_params, limit],
+    )
+    return cursor.fetchall(), bool(bound)
+
+
+def placeholders(values):
+    return ', '.join(['%s'] * len(values))
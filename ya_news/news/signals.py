@@ -0,0 +1,88 @@
+from functools import partial
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.dispatch import receiver
+
+from .cache import (
+    bump_news_version,
+    invalidate_home_cache,
+    invalidate_user_cache,
+)
+from .live import comment_message, get_broker
+from .models import Comment, News
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def reset_home_cache(sender, using, **kwargs):
+    """
+    Любое изменение новостей или комментариев меняет ленту.
+
+    Версия сбрасывается после фиксации транзакции: иначе параллельный
+    читатель успел бы собрать ленту из старых данных и положить её в
+    кэш под новой версией.
+    """
+    transaction.on_commit(invalidate_home_cache, using=using)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def reset_news_version(sender, instance, using, **kwargs):
+    """Правка новости меняет её страницу и ETag."""
+    transaction.on_commit(
+        partial(bump_news_version, instance.pk), using=using
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def reset_comment_news_version(sender, instance, using, **kwargs):
+    """Новый, исправленный или удалённый комментарий меняет страницу."""
+    transaction.on_commit(
+        partial(bump_news_version, instance.news_id), using=using
+    )
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment(sender, instance, created, raw, using, **kwargs):
+    """Новый комментарий уходит подписчикам после фиксации транзакции."""
+    if not created or raw:
+        return
+    message = comment_message(
+        instance.pk,
+        instance.author.get_username(),
+        instance.text,
+        instance.created,
+    )
+    transaction.on_commit(
+        lambda: get_broker().publish(instance.news_id, message), using=using
+    )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def reset_user_cache(sender, instance, using, **kwargs):
+    """
+    Пароль, активность или права пользователя могли измениться.
+
+    Запись сбрасывается после фиксации: иначе параллельный запрос успел
+    бы положить в кэш прежнюю строку ещё на AUTH_USER_CACHE_TIMEOUT.
+    """
+    transaction.on_commit(
+        partial(invalidate_user_cache, instance.pk), using=using
+    )
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Прагмы из NEWS_SQLITE_PRAGMAS для каждого нового соединения."""
+    if connection.vendor != 'sqlite' or not settings.NEWS_SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.NEWS_SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
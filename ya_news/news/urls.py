@@ -1,12 +1,31 @@
+from django.conf import settings
 from django.urls import path
 
-from news import views
+from news import async_views, views
 
 app_name = 'news'
 
+if settings.NEWS_ASYNC_VIEWS:
+    news_list = async_views.AsyncNewsList.as_view()
+    news_detail = async_views.AsyncNewsDetail.as_view()
+else:
+    news_list = views.NewsList.as_view()
+    news_detail = views.NewsDetailView.as_view()
+
 urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path('', news_list, name='home'),
+    path('news/<int:pk>/', news_detail, name='detail'),
+    path(
+        'news/<int:pk>/live/',
+        async_views.NewsLiveComments.as_view(),
+        name='live',
+    ),
+    path('search/', views.NewsSearch.as_view(), name='search'),
+    path(
+        'export/<slug:kind>.<slug:format>',
+        views.NewsExport.as_view(),
+        name='export',
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
@@ -1,11 +1,95 @@
+import hashlib
+from concurrent import futures
+from http import HTTPStatus
+
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, HttpResponseRedirect,
+    StreamingHttpResponse
+)
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
 from django.views import generic
+from django.views.decorators.http import condition
 
-from .forms import CommentForm
+from .cache import (
+    HOME_CHANGED_KEY,
+    get_news_version,
+    home_cache,
+    home_cache_key,
+)
+from .export import EXPORTS, FORMATS, export_lines
+from .forms import CommentForm, DateRangeForm, SearchForm
+from .ingest import comment_queue
 from .models import Comment, News
+from .pagination import InvalidCursor, KeysetPaginator
+from .replica import primary_reads_since
+from .search import search_news
+
+
+def get_page(queryset, ordering, per_page, cursor):
+    """Страница списка по курсору из запроса."""
+    paginator = KeysetPaginator(queryset, ordering, per_page)
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        raise Http404('Некорректный курсор.')
+
+
+async def aget_page(queryset, ordering, per_page, cursor):
+    """Асинхронный get_page()."""
+    paginator = KeysetPaginator(queryset, ordering, per_page)
+    try:
+        return await paginator.apage(cursor)
+    except InvalidCursor:
+        raise Http404('Некорректный курсор.')
+
+
+def news_validators(pk):
+    """
+    Поля, по которым видно, изменилась ли страница новости.
+
+    Одним запросом по индексу берём дату новости, счётчик и время
+    последнего комментария.
+    """
+    last_comment = Comment.objects.filter(
+        news=OuterRef('pk')
+    ).order_by('-created').values('created')[:1]
+    return News.objects.filter(pk=pk).annotate(
+        last_comment=Subquery(last_comment)
+    ).values_list('date', 'comment_count', 'last_comment')
+
+
+def make_news_etag(request, pk, validators):
+    """
+    Собирает тег ETag из полей новости.
+
+    Правки текста новости и комментариев поля из news_validators() не
+    меняют, поэтому добавляем версию этой новости, которую сбрасывают
+    сигналы. Страница зависит от пользователя и курсора, они тоже
+    входят в тег.
+    """
+    if validators is None:
+        return None
+    user = request.user
+    return quote_etag(hashlib.md5(repr((
+        validators,
+        get_news_version(pk),
+        user.pk if user.is_authenticated else None,
+        request.GET.urlencode(),
+    )).encode()).hexdigest())
+
+
+def news_detail_etag(request, pk):
+    """Тег ETag страницы новости, посчитанный без её отрисовки."""
+    return make_news_etag(request, pk, news_validators(pk).first())
 
 
 class NewsList(generic.ListView):
@@ -13,26 +97,95 @@ class NewsList(generic.ListView):
     model = News
     template_name = 'news/home.html'
 
+    def get(self, request, *args, **kwargs):
+        """
+        Отдаём готовую страницу из кэша, если она там есть.
+
+        Кэш сбрасывается сигналами при изменении новостей и комментариев.
+        Сразу после сброса страница собирается с основной базы.
+        """
+        key = home_cache_key(request)
+        content = home_cache().get(key)
+        if content is not None:
+            return HttpResponse(content)
+        # Страница отрисовывается здесь: запросы к базе идут при отрисовке.
+        with primary_reads_since(cache.get(HOME_CHANGED_KEY)):
+            response = super().get(request, *args, **kwargs).render()
+        home_cache().set(
+            key, response.content, settings.NEWS_HOME_CACHE_TIMEOUT
+        )
+        return response
+
     def get_queryset(self):
         """
-        Выводим только несколько последних новостей.
+        Выводим страницу последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество на странице определяется в настройках проекта.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        self.page = get_page(
+            self.model.objects.all(),
+            ('-date', '-pk'),
+            settings.NEWS_COUNT_ON_HOME_PAGE,
+            self.request.GET.get('cursor'),
+        )
+        return self.page.object_list
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_obj'] = self.page
+        return context
+
+
+class NewsSearch(generic.ListView):
+    """
+    Полнотекстовый поиск по архиву новостей.
+
+    По частому слову ранжируются только NEWS_SEARCH_CANDIDATES самых
+    свежих совпадений; страница говорит об этом и предлагает сузить
+    период, в пределах которого ограничение считается заново.
+    """
+    template_name = 'news/search.html'
+
+    def get_queryset(self):
+        self.form = SearchForm(self.request.GET or None)
+        if not self.form.is_valid():
+            return []
+        data = self.form.cleaned_data
+        return search_news(
+            data['q'],
+            settings.NEWS_SEARCH_LIMIT,
+            date_from=data['date_from'],
+            date_to=data['date_to'],
+            comments=settings.NEWS_SEARCH_COMMENTS,
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['form'] = self.form
+        context['candidates'] = settings.NEWS_SEARCH_CANDIDATES
+        return context
+
 
+class CommentPageMixin:
+    """Добавляет в контекст страницу комментариев новости."""
 
-class NewsDetail(generic.DetailView):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comment_page'] = get_page(
+            self.object.comment_set.select_related('author'),
+            ('created', 'pk'),
+            settings.NEWS_COMMENTS_PER_PAGE,
+            self.request.GET.get('cursor'),
+        )
+        return context
+
+
+class NewsDetail(CommentPageMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
+        obj = get_object_or_404(self.model, pk=self.kwargs['pk'])
         return obj
 
     def get_context_data(self, **kwargs):
@@ -44,6 +197,7 @@ class NewsDetail(generic.DetailView):
 
 class NewsComment(
         LoginRequiredMixin,
+        CommentPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -52,30 +206,70 @@ class NewsComment(
     template_name = 'news/detail.html'
 
     def post(self, request, *args, **kwargs):
+        """
+        Новость загружаем, только если форму придётся показать снова.
+
+        При успешной записи объект новости не нужен: хватает pk из URL.
+        """
+        form = self.get_form()
+        if form.is_valid():
+            return self.form_valid(form)
         self.object = self.get_object()
-        return super().post(request, *args, **kwargs)
+        return self.form_invalid(form)
 
     def form_valid(self, form):
+        """
+        Сначала увеличиваем счётчик комментариев.
+
+        Обновлённая строка заодно подтверждает, что новость существует,
+        поэтому запись комментария обходится одним UPDATE и одним INSERT.
+        С NEWS_COMMENT_QUEUE запись отдаётся очереди news.ingest, которая
+        сохраняет комментарии многих запросов одной транзакцией. Если
+        очередь не успела за NEWS_COMMENT_QUEUE_TIMEOUT секунд, ответ 503:
+        поток сервера не должен ждать зависшую запись бесконечно.
+        """
+        news_id = self.kwargs['pk']
         comment = form.save(commit=False)
-        comment.news = self.object
+        comment.news_id = news_id
         comment.author = self.request.user
-        comment.save()
-        return super().form_valid(form)
+        if settings.NEWS_COMMENT_QUEUE:
+            try:
+                comment_queue.submit(
+                    comment, settings.NEWS_COMMENT_QUEUE_TIMEOUT
+                )
+            except News.DoesNotExist:
+                raise Http404('Новость не найдена.')
+            except futures.TimeoutError:
+                return HttpResponse(
+                    'Комментарий не успел сохраниться, попробуйте ещё раз.',
+                    status=HTTPStatus.SERVICE_UNAVAILABLE,
+                )
+            return HttpResponseRedirect(self.get_success_url())
+        with transaction.atomic():
+            updated = News.objects.filter(pk=news_id).update(
+                comment_count=F('comment_count') + 1
+            )
+            if not updated:
+                raise Http404('Новость не найдена.')
+            comment.save()
+        return HttpResponseRedirect(self.get_success_url())
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.kwargs['pk']}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
+    detail_view = staticmethod(NewsDetail.as_view())
+    comment_view = staticmethod(NewsComment.as_view())
 
+    @method_decorator(condition(etag_func=news_detail_etag))
     def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+        return self.detail_view(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+        return self.comment_view(request, *args, **kwargs)
 
 
 class CommentBase(LoginRequiredMixin):
@@ -83,14 +277,15 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -102,3 +297,43 @@ class CommentUpdate(CommentBase, generic.UpdateView):
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    def form_valid(self, form):
+        with transaction.atomic():
+            response = super().form_valid(form)
+            # Счётчик мог разойтись с реальностью (комментарии,
+            # записанные в обход сайта и админки), в минус его не уводим.
+            News.objects.filter(
+                pk=self.object.news_id, comment_count__gt=0
+            ).update(comment_count=F('comment_count') - 1)
+        return response
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class NewsExport(generic.View):
+    """
+    Потоковая выгрузка новостей или комментариев для аналитики.
+
+    Только для сотрудников. Период задаётся параметрами date_from и
+    date_to, формат — расширением в адресе: csv или ndjson.
+    """
+
+    def get(self, request, kind, format):
+        if kind not in EXPORTS or format not in FORMATS:
+            raise Http404('Нет такой выгрузки.')
+        form = DateRangeForm(request.GET)
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text())
+        response = StreamingHttpResponse(
+            export_lines(
+                kind,
+                format,
+                settings.NEWS_EXPORT_CHUNK_SIZE,
+                **form.cleaned_data,
+            ),
+            content_type=FORMATS[format][0],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{kind}.{format}"'
+        )
+        return response
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -21,6 +22,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'news.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,6 +45,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'news.context_processors.fragment_cache',
             ],
         },
     },
@@ -58,6 +61,86 @@ DATABASES = {
     }
 }
 
+# Профиль SQLite для продакшена: постоянные соединения, запись в
+# транзакциях BEGIN IMMEDIATE, чтобы читающая транзакция не упиралась
+# в блокировку при переходе к записи, и прагмы, которые news.signals
+# применяет к каждому новому соединению.
+NEWS_SQLITE_PROFILE = os.environ.get('NEWS_SQLITE_PROFILE') == '1'
+NEWS_SQLITE_PRAGMAS = {}
+if NEWS_SQLITE_PROFILE:
+    DATABASES['default'].update(
+        CONN_MAX_AGE=10 * 60,
+        CONN_HEALTH_CHECKS=True,
+        OPTIONS={'transaction_mode': 'IMMEDIATE'},
+    )
+    NEWS_SQLITE_PRAGMAS = {
+        # Читатели не блокируют писателя и наоборот.
+        'journal_mode': 'WAL',
+        # В режиме WAL база остаётся целостной, при сбое питания можно
+        # потерять лишь последние транзакции.
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+        # Отрицательное значение — размер в КиБ, а не в страницах.
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+    }
+
+# Реплика для чтения (см. news.replica). Локально это копия основной
+# базы, которую обновляет команда sync_replica.
+NEWS_REPLICA_DB = os.environ.get('NEWS_REPLICA_DB')
+# Сколько секунд после записи клиент читает с основной базы.
+NEWS_PRIMARY_STICKY_SECONDS = 10
+if NEWS_REPLICA_DB:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': NEWS_REPLICA_DB,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['news.replica.ReplicaRouter']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index(
+            'django.contrib.sessions.middleware.SessionMiddleware'
+        ),
+        'news.replica.StickyPrimaryMiddleware',
+    )
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Фрагменты шаблонов отдельно: их тысячи, и они не должны вытеснять
+    # сессии и страницы из основного кэша.
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fragments',
+        'OPTIONS': {'MAX_ENTRIES': 50_000},
+    },
+    # Готовые страницы главной: вариант на каждого пользователя и курсор
+    # из адреса, поэтому их число задаёт клиент. Отдельно, чтобы перебор
+    # курсоров не вытеснял сессии и пользователей из основного кэша.
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pages',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# Сессии читаются из кэша, в базу только пишутся и читаются при промахе.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Пользователь запроса тоже берётся из кэша. Сессии, открытые с
+# ModelBackend, переводит на этот бэкенд миграция
+# news.0005_cached_backend_sessions.
+AUTHENTICATION_BACKENDS = [
+    'news.backends.CachedModelBackend',
+]
+# С LocMemCache у каждого процесса свой кэш, и сброс при изменении
+# пользователя виден только в нём: другие процессы узнают о смене пароля
+# или блокировке лишь через AUTH_USER_CACHE_TIMEOUT. В продакшене с
+# несколькими процессами нужен общий кэш (Redis, Memcached).
+AUTH_USER_CACHE_TIMEOUT = 5 * 60
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +163,57 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+NEWS_COMMENTS_PER_PAGE = 50
+NEWS_HOME_CACHE_TIMEOUT = 60 * 60
+# Кэш отрисованных карточек новостей и комментариев. Ключ включает
+# выводимые поля, поэтому правка сама даёт новый ключ.
+NEWS_FRAGMENT_CACHE_TIMEOUT = 24 * 60 * 60
+NEWS_SEARCH_LIMIT = 20
+# Сколько самых свежих совпадений ранжировать по релевантности. Слово,
+# которое есть почти в каждой новости, иначе ранжировалось бы секундами.
+NEWS_SEARCH_CANDIDATES = 1000
+# Слово, у которого больше совпадений, не влияет на порядок найденного:
+# bm25 читал бы весь список новостей с ним.
+NEWS_SEARCH_FREQUENT = 20000
+NEWS_EXPORT_CHUNK_SIZE = 5000
+# Искать ли и в текстах комментариев. Индекс комментариев обновляется
+# в любом случае, настройка влияет только на поиск.
+NEWS_SEARCH_COMMENTS = True
+
+# Запись комментариев пачками через очередь (см. news.ingest): пачка
+# уходит в базу, когда набралось столько комментариев или прошло
+# столько секунд с первого.
+NEWS_COMMENT_QUEUE = os.environ.get('NEWS_COMMENT_QUEUE') == '1'
+NEWS_COMMENT_BATCH_SIZE = 100
+NEWS_COMMENT_BATCH_WAIT = 0.005
+# Сколько секунд запрос ждёт записи своей пачки, потом отвечает 503.
+NEWS_COMMENT_QUEUE_TIMEOUT = 5
+
+# Поток новых комментариев (см. news.live), работает под ASGI.
+# LocalBroker рассылает комментарии, записанные в этом же процессе;
+# если процессов несколько, нужен news.live.DatabaseBroker.
+NEWS_LIVE_BROKER = 'news.live.LocalBroker'
+NEWS_LIVE_POLL_INTERVAL = 1
+NEWS_LIVE_HEARTBEAT = 15
+# Сколько событий ждёт медленного клиента, старые вытесняются.
+NEWS_LIVE_QUEUE_SIZE = 100
+
+# Файл с дополнительными запрещёнными словами, по одному на строку.
+# Изменения подхватываются без перезапуска.
+NEWS_BAD_WORDS_FILE = None
+
+# Асинхронные версии главной и страницы новости для запуска под ASGI.
+NEWS_ASYNC_VIEWS = os.environ.get('NEWS_ASYNC_VIEWS') == '1'
+
+# Подсчёт запросов к базе для каждого адреса (см. news.query_budget).
+QUERY_BUDGET_ENABLED = DEBUG
+# Лимиты включают чтение сессии и пользователя для авторизованных.
+QUERY_BUDGETS = {
+    'news:home': 3,
+    'news:detail': 6,
+    # По новостям и комментариям: кандидаты, частые слова, ранжирование,
+    # подсветка.
+    'news:search': 9,
+    'news:edit': 4,
+    'news:delete': 7,
+}
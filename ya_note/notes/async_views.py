@@ -0,0 +1,58 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404
+from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+from django.views import generic
+
+from .cache import aget_notes_count
+from .views import aget_note, alist_page, note_etag
+
+
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    """
+    LoginRequiredMixin для асинхронных view.
+
+    Пользователь загружается через request.auser() и подставляется в
+    request.user, чтобы шаблоны не обращались к базе синхронно.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await generic.View.dispatch(self, request, *args, **kwargs)
+
+
+class AsyncNotesList(AsyncLoginRequiredMixin, generic.View):
+    """Асинхронный список заметок пользователя."""
+
+    async def get(self, request, *args, **kwargs):
+        page = await alist_page(request.user, request.GET.get('cursor', ''))
+        return render(request, 'notes/list.html', {
+            'object_list': page.object_list,
+            'note_list': page.object_list,
+            'page_obj': page,
+            'notes_count': await aget_notes_count(request.user),
+        })
+
+
+class AsyncNoteDetail(AsyncLoginRequiredMixin, generic.View):
+    """
+    Асинхронная страница заметки.
+
+    Заметка берётся из кэша автора, тег ETag считается по ней же.
+    """
+
+    async def get(self, request, slug):
+        note = await aget_note(request.user, slug)
+        if note is None:
+            raise Http404('Заметка не найдена.')
+        etag = note_etag(note)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = render(request, 'notes/detail.html', {
+                'note': note,
+                'object': note,
+            })
+        response.headers['ETag'] = etag
+        return response
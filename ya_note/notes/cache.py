@@ -0,0 +1,184 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Note
+
+# Что кэшируется для автора; по этим же видам считаются попадания.
+KINDS = ('list', 'detail', 'count')
+
+
+def version_key(author_id):
+    return f'notes:{author_id}:version'
+
+
+def get_author_version(author_id):
+    """Текущая версия кэша заметок автора."""
+    key = version_key(author_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+async def aget_author_version(author_id):
+    """Асинхронный get_author_version()."""
+    key = version_key(author_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, 1, timeout=None)
+        version = await cache.aget(key, 1)
+    return version
+
+
+def bump_author_version(author_id):
+    """
+    Сбрасывает весь кэш заметок автора за O(1).
+
+    Ключи содержат номер версии, поэтому достаточно его увеличить:
+    старые записи больше никогда не будут прочитаны и вытеснятся сами.
+    """
+    try:
+        cache.incr(version_key(author_id))
+    except ValueError:
+        cache.set(version_key(author_id), 2, timeout=None)
+
+
+def author_key(author_id, version, kind, part):
+    """
+    Ключ в пространстве имён автора.
+
+    part приходит из адреса (слаг, курсор), поэтому он хэшируется:
+    длина ключа не зависит от запроса.
+    """
+    digest = hashlib.md5(str(part).encode()).hexdigest()
+    return f'notes:{author_id}:{version}:{kind}:{digest}'
+
+
+def stats_key(kind, outcome):
+    return f'notes:stats:{kind}:{outcome}'
+
+
+def record(kind, hit):
+    """Считает попадание или промах кэша вида kind."""
+    key = stats_key(kind, 'hit' if hit else 'miss')
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+async def arecord(kind, hit):
+    """Асинхронный record()."""
+    key = stats_key(kind, 'hit' if hit else 'miss')
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 1, timeout=None)
+
+
+def get_stats():
+    """Попадания и промахи по видам: {kind: (hits, misses)}."""
+    keys = {
+        (kind, outcome): stats_key(kind, outcome)
+        for kind in KINDS for outcome in ('hit', 'miss')
+    }
+    values = cache.get_many(keys.values())
+    return {
+        kind: tuple(
+            values.get(keys[kind, outcome], 0) for outcome in ('hit', 'miss')
+        )
+        for kind in KINDS
+    }
+
+
+def report_stats(stdout):
+    """Таблица попаданий в кэш заметок по видам."""
+    stdout.write(f'{"кэш":<8} {"попаданий":>10} {"промахов":>9} {"доля":>6}')
+    for kind, (hits, misses) in get_stats().items():
+        total = hits + misses
+        ratio = f'{hits / total:.0%}' if total else '—'
+        stdout.write(f'{kind:<8} {hits:>10} {misses:>9} {ratio:>6}')
+
+
+def reset_stats():
+    cache.delete_many(
+        [stats_key(kind, outcome) for kind in KINDS
+         for outcome in ('hit', 'miss')]
+    )
+
+
+def get_or_compute(author_id, kind, part, compute):
+    """
+    Значение из кэша автора или результат compute(), если его там нет.
+
+    None не кэшируется: например, чужую или удалённую заметку каждый
+    раз ищем в базе заново.
+    """
+    key = author_key(author_id, get_author_version(author_id), kind, part)
+    value = cache.get(key)
+    record(kind, value is not None)
+    if value is None:
+        value = compute()
+        if value is not None:
+            cache.set(key, value, settings.NOTES_CACHE_TIMEOUT)
+    return value
+
+
+async def aget_or_compute(author_id, kind, part, compute):
+    """Асинхронный get_or_compute(), compute — корутинная функция."""
+    version = await aget_author_version(author_id)
+    key = author_key(author_id, version, kind, part)
+    value = await cache.aget(key)
+    await arecord(kind, value is not None)
+    if value is None:
+        value = await compute()
+        if value is not None:
+            await cache.aset(key, value, settings.NOTES_CACHE_TIMEOUT)
+    return value
+
+
+def get_notes_count(author):
+    """Число заметок автора; COUNT(*) выполняется только при промахе."""
+    return get_or_compute(
+        author.pk,
+        'count',
+        '',
+        Note.objects.filter(author=author).count,
+    )
+
+
+async def aget_notes_count(author):
+    """Асинхронный get_notes_count()."""
+    return await aget_or_compute(
+        author.pk,
+        'count',
+        '',
+        Note.objects.filter(author=author).acount,
+    )
+
+
+def user_cache_key(user_id):
+    # id из сессии приходит строкой, из сигнала — числом.
+    return f'notes:user:{user_id}'
+
+
+def get_cached_user(user_id, load):
+    """
+    Пользователь по id из кэша или результат load(), если его там нет.
+
+    None (пользователь удалён) не кэшируется.
+    """
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = load()
+        if user is not None:
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_user_cache(user_id):
+    cache.delete(user_cache_key(user_id))
@@ -1,5 +1,3 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
@@ -16,14 +14,37 @@ class NoteForm(forms.ModelForm):
         fields = ('title', 'text', 'slug')
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
+        """
+        Обрабатывает случай, если slug не уникален.
+
+        Пустой slug подберёт Note.save() с учётом уже занятых.
+        """
+        slug = self.cleaned_data.get('slug')
         if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
+            return slug
         if Note.objects.filter(
                 slug=slug
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
         return slug
+
+    def validate_unique(self):
+        """
+        Проверка уникальности модели без slug.
+
+        slug уже проверил clean_slug, второй такой же запрос к базе
+        не нужен.
+        """
+        exclude = self._get_validation_exclusions() | {'slug'}
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as error:
+            self._update_errors(error)
+
+
+class ImportForm(forms.Form):
+    """Загрузка заметок из файла NDJSON."""
+    file = forms.FileField(
+        label='Файл',
+        help_text='По одной заметке на строку: {"title", "text", "slug"}',
+    )
@@ -0,0 +1,136 @@
+import itertools
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+)
+from django.db import connections
+from django.test import Client
+
+
+def percentile(values, percent):
+    """Перцентиль по отсортированному списку значений."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(len(values) * percent / 100))
+    return values[index]
+
+
+def make_session_key(user):
+    """Создаёт сессию, в которой user авторизован, как после входа."""
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return session.session_key
+
+
+class InProcessTransport:
+    """Запросы через тестовый клиент Django прямо в этом процессе."""
+
+    def __init__(self, session_key=None):
+        self.session_key = session_key
+        self.local = threading.local()
+
+    def get(self, path):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = Client(HTTP_HOST='localhost')
+            if self.session_key:
+                client.cookies[settings.SESSION_COOKIE_NAME] = (
+                    self.session_key
+                )
+        return client.get(path).status_code
+
+    def close(self):
+        connections.close_all()
+
+
+class HTTPTransport:
+    """Запросы к запущенному серверу по HTTP."""
+
+    def __init__(self, base_url, session_key=None):
+        self.base_url = base_url.rstrip('/')
+        self.headers = {}
+        if session_key:
+            self.headers['Cookie'] = (
+                f'{settings.SESSION_COOKIE_NAME}={session_key}'
+            )
+
+    def get(self, path):
+        request = urllib.request.Request(
+            self.base_url + path, headers=self.headers
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+    def close(self):
+        pass
+
+
+def run(transport, targets, total, concurrency):
+    """
+    Выполняет total запросов в concurrency потоков.
+
+    targets — список пар (маршрут, путь), запросы идут по ним по кругу.
+    Возвращает задержки по маршрутам, число ошибок по маршрутам и общее
+    время прогона.
+    """
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    counter = itertools.count()
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            while (index := next(counter)) < total:
+                route, path = targets[index % len(targets)]
+                started = time.perf_counter()
+                try:
+                    status = transport.get(path)
+                except OSError:
+                    status = None
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if status is None or status >= 400:
+                        errors[route] += 1
+                    else:
+                        latencies[route].append(elapsed)
+        finally:
+            transport.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def report(stdout, latencies, errors, elapsed):
+    """Таблица с пропускной способностью и перцентилями по маршрутам."""
+    stdout.write(
+        f'{"маршрут":<20} {"запросов":>9} {"ошибок":>7} {"в сек":>8} '
+        f'{"p50, мс":>9} {"p95, мс":>9} {"p99, мс":>9}'
+    )
+    for route in sorted(set(latencies) | set(errors)):
+        values = sorted(latencies[route])
+        stdout.write(
+            f'{route:<20} {len(values):>9} {errors[route]:>7} '
+            f'{len(values) / elapsed:>8.1f} '
+            f'{percentile(values, 50) * 1000:>9.1f} '
+            f'{percentile(values, 95) * 1000:>9.1f} '
+            f'{percentile(values, 99) * 1000:>9.1f}'
+        )
@@ -0,0 +1,83 @@
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    """Откатывает тестовые данные после замера."""
+
+
+def peak_memory(callback):
+    """Пиковый объём памяти, выделенной за время вызова, в КиБ."""
+    tracemalloc.start()
+    try:
+        callback()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пиковую память на один запрос списка заметок: '
+        'загрузка всех заметок целиком против страницы только с '
+        'показываемыми полями. Данные создаются во временной транзакции '
+        'и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--counts', type=int, nargs='+', default=[100, 1_000, 10_000]
+        )
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[100, 10_000],
+            help='длина текста заметки, символов',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"заметок":>8} {"текст":>7} '
+            f'{"все, КиБ":>10} {"страница, КиБ":>14}'
+        )
+        for count in options['counts']:
+            for size in options['sizes']:
+                try:
+                    with transaction.atomic():
+                        self.measure(count, size)
+                        raise Rollback
+                except Rollback:
+                    pass
+
+    def measure(self, count, size):
+        author = User.objects.create_user(username='benchmark-notes-list')
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {index}',
+                text='x' * size,
+                slug=f'benchmark-{index}',
+                author=author,
+            )
+            for index in range(count)
+        )
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(author)
+        # Прогрев: шаблоны и URL-резолвер не должны попасть в замер.
+        client.get('/notes/')
+        cache.clear()
+        # Так список работал раньше: все заметки автора со всеми полями.
+        full = peak_memory(
+            lambda: list(Note.objects.filter(author=author))
+        )
+        paged = peak_memory(lambda: client.get('/notes/'))
+        self.stdout.write(f'{count:>8} {size:>7} {full:>10.0f} {paged:>14.0f}')
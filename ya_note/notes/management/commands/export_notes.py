@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.ndjson import export_lines
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки пользователя в NDJSON, по заметке на строку.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--output', default='-', help='файл, по умолчанию stdout'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.NOTES_EXPORT_CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Нет такого пользователя.')
+        lines = export_lines(author, options['chunk_size'])
+        if options['output'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            file.writelines(lines)
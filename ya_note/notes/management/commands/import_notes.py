@@ -0,0 +1,46 @@
+import sys
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.ndjson import InvalidLine, import_lines
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает заметки пользователя из NDJSON, например выгруженные '
+        'export_notes. Занятые слаги получают суффикс.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('file', help='файл или - для stdin')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.NOTES_IMPORT_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Нет такого пользователя.')
+        try:
+            if options['file'] == '-':
+                created = import_lines(
+                    sys.stdin, author, options['batch_size']
+                )
+            else:
+                with open(options['file'], encoding='utf-8') as file:
+                    created = import_lines(
+                        file, author, options['batch_size']
+                    )
+        except InvalidLine as error:
+            raise CommandError(
+                f'{error}. Загружено заметок: {error.created}.'
+            )
+        self.stdout.write(f'Загружено заметок: {created}')
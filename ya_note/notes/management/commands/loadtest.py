@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.urls import reverse
+
+from notes import loadtest
+from notes.cache import report_stats, reset_stats
+from notes.models import Note
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон по страницам YaNote от имени пользователя '
+        '(по умолчанию — автора с наибольшим числом заметок): список и '
+        'страницы заметок. Без --server запросы идут через тестовый клиент '
+        'в этом процессе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2_000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--server', help='адрес запущенного сервера, http://host:port'
+        )
+        parser.add_argument('--username')
+        parser.add_argument('--samples', type=int, default=20)
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.all()
+        if options['username']:
+            user = users.get(username=options['username'])
+        else:
+            user = users.annotate(
+                notes_count=Count('note')
+            ).order_by('-notes_count').first()
+        if user is None:
+            raise CommandError(
+                'В базе нет пользователей, запустите seed_notes.'
+            )
+        session_key = loadtest.make_session_key(user)
+        if options['server']:
+            transport = loadtest.HTTPTransport(options['server'], session_key)
+        else:
+            transport = loadtest.InProcessTransport(session_key)
+        reset_stats()
+        latencies, errors, elapsed = loadtest.run(
+            transport,
+            self.targets(user, options['samples']),
+            options['requests'],
+            options['concurrency'],
+        )
+        loadtest.report(self.stdout, latencies, errors, elapsed)
+        if not options['server']:
+            self.stdout.write('')
+            report_stats(self.stdout)
+
+    def targets(self, user, samples):
+        targets = [
+            ('notes:home', reverse('notes:home')),
+            ('notes:list', reverse('notes:list')),
+        ]
+        slugs = Note.objects.filter(author=user).order_by('?').values_list(
+            'slug', flat=True
+        )[:samples]
+        targets += [
+            ('notes:detail', reverse('notes:detail', args=(slug,)))
+            for slug in slugs
+        ]
+        return targets
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from notes.cache import report_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Попадания и промахи кэша заметок по авторам. Счётчики хранятся в '
+        'самом кэше: с общим бэкендом (Redis, Memcached) они общие для '
+        'всех процессов, с LocMemCache — только у текущего.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true', help='обнулить счётчики'
+        )
+
+    def handle(self, *args, **options):
+        report_stats(self.stdout)
+        if options['reset']:
+            reset_stats()
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from notes.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает полнотекстовый индекс заметок пачками. Обычно индекс '
+        'обновляется триггерами сам, команда нужна после восстановления '
+        'из резервной копии или изменения настроек индекса. Пересборка '
+        'идёт в одной транзакции, запись в базу на это время ждёт.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        done = rebuild_index(
+            options['batch_size'],
+            progress=lambda done: self.stdout.write(
+                f'проиндексировано: {done}', ending='\r'
+            ),
+        )
+        self.stdout.write('')
+        self.stdout.write(f'Готово, заметок в индексе: {done}')
@@ -0,0 +1,130 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import IntegerField, Max
+from django.db.models.functions import Cast, Substr
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+def skewed_index(rng, size, skew):
+    """
+    Индекс от 0 до size - 1, смещённый к началу.
+
+    При skew = 1 распределение равномерное, чем больше skew, тем больше
+    заметок достаётся первым («активным») пользователям.
+    """
+    return min(size - 1, int(size * rng.random() ** skew))
+
+
+def next_number(queryset, field, prefix):
+    """
+    Номер, с которого продолжать значения вида prefix + номер в field.
+
+    Берётся наибольший из уже занятых, а не число строк: после удалений
+    или записей не из этой команды число строк совпало бы с занятым
+    номером, и вставка упала бы на уникальности.
+    """
+    last = queryset.filter(
+        **{f'{field}__regex': rf'^{prefix}[0-9]+$'}
+    ).aggregate(
+        last=Max(Cast(Substr(field, len(prefix) + 1), IntegerField()))
+    )['last']
+    return 0 if last is None else last + 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу большим объёмом синтетических заметок с '
+        'активными пользователями, у которых их десятки тысяч.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--notes', type=int, default=5_000_000)
+        parser.add_argument(
+            '--user-skew',
+            type=float,
+            default=4.0,
+            help='насколько заметки сосредоточены у активных авторов',
+        )
+        parser.add_argument(
+            '--max-text',
+            type=int,
+            default=2_000,
+            help='максимальная длина текста заметки, слов',
+        )
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        user_ids = self.create_users(options['users'])
+        self.create_notes(
+            options['notes'],
+            user_ids,
+            options['user_skew'],
+            options['max_text'],
+        )
+
+    def batches(self, total, build, keep_ids=True):
+        """
+        Создаёт объекты пачками по batch_size, каждую в транзакции.
+
+        Возвращает список pk созданных объектов, если keep_ids.
+        """
+        created = []
+        done = 0
+        for start in range(0, total, self.batch_size):
+            objects = [
+                build(index)
+                for index in range(start, min(total, start + self.batch_size))
+            ]
+            model = type(objects[0])
+            with transaction.atomic():
+                model.objects.bulk_create(objects)
+            if keep_ids:
+                created.extend(obj.pk for obj in objects)
+            done += len(objects)
+            self.stdout.write(
+                f'{model._meta.verbose_name}: {done} из {total}', ending='\r'
+            )
+        self.stdout.write('')
+        return created
+
+    def create_users(self, total):
+        # Хэш пароля считается один раз: для всех пользователей он общий.
+        password = make_password('password')
+        offset = next_number(User.objects, 'username', 'user')
+        return self.batches(total, lambda index: User(
+            username=f'user{offset + index}', password=password
+        ))
+
+    def create_notes(self, total, user_ids, user_skew, max_text):
+        if not user_ids:
+            return
+        rng = self.rng
+        # Слаг задаём сами: Note.save() при bulk_create не вызывается.
+        offset = next_number(Note.objects, 'slug', 'seed-')
+        words = ('заметка', 'купить', 'позвонить', 'не', 'забыть', 'важно')
+
+        def build(index):
+            return Note(
+                title=f'Заметка {offset + index}',
+                text=' '.join(
+                    rng.choice(words)
+                    for _ in range(int(max_text * rng.random() ** 3) + 1)
+                ),
+                slug=f'seed-{offset + index}',
+                author_id=user_ids[
+                    skewed_index(rng, len(user_ids), user_skew)
+                ],
+            )
+
+        self.batches(total, build, keep_ids=False)
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# Внешнее содержимое: текст хранится только в notes_note, а индекс
+# обновляется триггерами при любой записи, в том числе bulk_create и
+# update(), которые не отправляют сигналы моделей. Автор попадает в
+# индекс отдельной колонкой: поиск фильтрует по нему внутри MATCH и не
+# перебирает совпадения из заметок других авторов.
+CREATE = [
+    """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        title, text, author_id,
+        content='notes_note', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_insert AFTER INSERT ON notes_note BEGIN
+        INSERT INTO notes_note_fts(rowid, title, text, author_id)
+        VALUES (new.id, new.title, new.text, new.author_id);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_delete AFTER DELETE ON notes_note BEGIN
+        INSERT INTO notes_note_fts(
+            notes_note_fts, rowid, title, text, author_id
+        )
+        VALUES ('delete', old.id, old.title, old.text, old.author_id);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_update
+    AFTER UPDATE OF title, text, author_id ON notes_note BEGIN
+        INSERT INTO notes_note_fts(
+            notes_note_fts, rowid, title, text, author_id
+        )
+        VALUES ('delete', old.id, old.title, old.text, old.author_id);
+        INSERT INTO notes_note_fts(rowid, title, text, author_id)
+        VALUES (new.id, new.title, new.text, new.author_id);
+    END
+    """,
+    "INSERT INTO notes_note_fts(notes_note_fts) VALUES ('rebuild')",
+]
+DROP = [
+    'DROP TRIGGER IF EXISTS notes_note_fts_update',
+    'DROP TRIGGER IF EXISTS notes_note_fts_delete',
+    'DROP TRIGGER IF EXISTS notes_note_fts_insert',
+    'DROP TABLE IF EXISTS notes_note_fts',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE, DROP),
+    ]
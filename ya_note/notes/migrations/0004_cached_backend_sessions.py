@@ -0,0 +1,53 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.sessions.backends.cached_db import KEY_PREFIX
+from django.core.cache import caches
+from django.db import migrations
+from django.utils import timezone
+
+MODEL_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+CACHED_BACKEND = 'notes.backends.CachedModelBackend'
+
+
+def move_sessions(apps, old, new):
+    """
+    Переписывает путь бэкенда в открытых сессиях с old на new.
+
+    В сессии записан путь бэкенда, которым пользователь вошёл, и сессия
+    с путём не из AUTHENTICATION_BACKENDS считается недействительной.
+    Копии сессий в кэше удаляются, чтобы они не вернули старый путь.
+    """
+    Session = apps.get_model('sessions', 'Session')
+    store = import_module(settings.SESSION_ENGINE).SessionStore()
+    cache = caches[settings.SESSION_CACHE_ALIAS]
+    sessions = Session.objects.filter(expire_date__gt=timezone.now())
+    for session in sessions.iterator():
+        data = store.decode(session.session_data)
+        if data.get(BACKEND_SESSION_KEY) != old:
+            continue
+        data[BACKEND_SESSION_KEY] = new
+        session.session_data = store.encode(data)
+        session.save(update_fields=['session_data'])
+        cache.delete(KEY_PREFIX + session.session_key)
+
+
+def use_cached_backend(apps, schema_editor):
+    move_sessions(apps, MODEL_BACKEND, CACHED_BACKEND)
+
+
+def use_model_backend(apps, schema_editor):
+    move_sessions(apps, CACHED_BACKEND, MODEL_BACKEND)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_search'),
+        ('sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_cached_backend, use_model_backend),
+    ]
@@ -1,8 +1,101 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
 
 from pytils.translit import slugify
 
+# Сколько раз пробуем подобрать слаг заново, если его успели занять.
+SLUG_ATTEMPTS = 10
+# Место под суффикс «-N» у слишком длинных слагов.
+SLUG_SUFFIX_ROOM = 11
+# Сколько разных основ слагов проверяем одним запросом.
+SLUG_LOOKUP_BATCH = 200
+
+
+def slug_stem(base, max_length):
+    """base, укороченный так, чтобы после него поместился суффикс."""
+    if len(base) + SLUG_SUFFIX_ROOM > max_length:
+        return base[:max_length - SLUG_SUFFIX_ROOM]
+    return base
+
+
+def slug_lookup(base, max_length):
+    """
+    Условие на все слаги, которые может занять base: сам base и
+    диапазон ['stem-', 'stem.') по уникальному индексу на slug.
+    """
+    stem = slug_stem(base, max_length)
+    return Q(slug=base) | Q(slug__gt=f'{stem}-', slug__lt=f'{stem}.')
+
+
+def add_suffix_number(highest, slug):
+    """Учитывает slug вида 'stem-N' в словаре наибольших суффиксов."""
+    stem, _, number = slug.rpartition('-')
+    if stem and number.isdigit():
+        prefix = f'{stem}-'
+        highest[prefix] = max(highest.get(prefix, 0), int(number))
+
+
+def suffix_numbers(slugs):
+    """Наибольший числовой суффикс N среди слагов вида 'stem-N'."""
+    highest = {}
+    for slug in slugs:
+        add_suffix_number(highest, slug)
+    return highest
+
+
+def free_slug(base, max_length, taken, highest):
+    """
+    Первый слаг вида base, base-2, base-3..., которого нет в taken.
+
+    highest — suffix_numbers(taken), посчитанный заранее.
+    """
+    if base not in taken:
+        return base
+    prefix = f'{slug_stem(base, max_length)}-'
+    return f'{prefix}{highest.get(prefix, 1) + 1}'
+
+
+def next_free_slug(base, max_length, exclude_pk=None):
+    """
+    Первый свободный слаг вида base, base-2, base-3...
+
+    Все занятые варианты приходят одним запросом.
+    """
+    taken = set(
+        Note.objects.filter(slug_lookup(base, max_length))
+        .exclude(pk=exclude_pk)
+        .values_list('slug', flat=True)
+    )
+    return free_slug(base, max_length, taken, suffix_numbers(taken))
+
+
+def allocate_slugs(bases, max_length):
+    """
+    Свободные и разные слаги для пачки заметок, по одному на base.
+
+    Занятые слаги читаются одним запросом на SLUG_LOOKUP_BATCH разных
+    base: каждый даёт два условия, а SQLite ограничивает глубину
+    выражения в запросе.
+    """
+    unique = list(dict.fromkeys(bases))
+    taken = set()
+    for start in range(0, len(unique), SLUG_LOOKUP_BATCH):
+        lookup = Q()
+        for base in unique[start:start + SLUG_LOOKUP_BATCH]:
+            lookup |= slug_lookup(base, max_length)
+        taken.update(
+            Note.objects.filter(lookup).values_list('slug', flat=True)
+        )
+    highest = suffix_numbers(taken)
+    slugs = []
+    for base in bases:
+        slug = free_slug(base, max_length, taken, highest)
+        taken.add(slug)
+        add_suffix_number(highest, slug)
+        slugs.append(slug)
+    return slugs
+
 
 class Note(models.Model):
     title = models.CharField(
@@ -28,11 +121,32 @@ class Note(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'slug'), name='note_author_slug_idx'
+            ),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Пустой слаг получаем из заголовка с первым свободным суффиксом.
+
+        Если параллельный запрос успел занять тот же слаг, INSERT упадёт
+        на уникальном индексе: подбираем слаг заново и повторяем.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        max_slug_length = self._meta.get_field('slug').max_length
+        base = slugify(self.title)[:max_slug_length]
+        for attempt in range(SLUG_ATTEMPTS):
+            self.slug = next_free_slug(base, max_slug_length, self.pk)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if attempt == SLUG_ATTEMPTS - 1:
+                    raise
@@ -0,0 +1,118 @@
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from pytils.translit import slugify
+
+from .cache import bump_author_version
+from .models import SLUG_ATTEMPTS, Note, allocate_slugs
+
+FIELDS = ('title', 'text', 'slug')
+
+
+class InvalidLine(ValueError):
+    """Строка файла импорта, из которой не получилась заметка."""
+
+    def __init__(self, number, message):
+        super().__init__(f'строка {number}: {message}')
+        self.number = number
+        # Сколько заметок до этой строки уже сохранено.
+        self.created = 0
+
+
+def export_lines(author, chunk_size):
+    """
+    Заметки автора по одной на строку JSON.
+
+    Строки читаются из базы пачками по chunk_size, без создания
+    объектов моделей, поэтому память не зависит от числа заметок.
+    """
+    notes = (
+        Note.objects.filter(author=author)
+        .order_by('pk')
+        .values_list(*FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    for values in notes:
+        yield json.dumps(dict(zip(FIELDS, values)), ensure_ascii=False)
+        yield '\n'
+
+
+def parse_lines(lines, author):
+    """
+    Несохранённые заметки из строк NDJSON, по одной за раз.
+
+    Поля проверяются валидаторами модели, но без запросов к базе:
+    уникальность слагов обеспечивает allocate_slugs().
+    """
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            raise InvalidLine(number, 'некорректный JSON')
+        if not isinstance(data, dict):
+            raise InvalidLine(number, 'ожидался объект JSON')
+        note = Note(
+            author=author,
+            **{field: data[field] for field in FIELDS if field in data},
+        )
+        try:
+            note.full_clean(
+                exclude=('author',),
+                validate_unique=False,
+                validate_constraints=False,
+            )
+        except ValidationError as error:
+            raise InvalidLine(number, '; '.join(error.messages))
+        yield note
+
+
+def save_batch(notes):
+    """
+    Сохраняет пачку заметок одним INSERT в транзакции.
+
+    Слаги, заданные в файле, сохраняются, если свободны, иначе к ним
+    добавляется суффикс, пустые получаются из заголовков. Если слаг
+    успели занять параллельно, пачка повторяется с новыми слагами.
+    """
+    max_length = Note._meta.get_field('slug').max_length
+    bases = [
+        note.slug or slugify(note.title)[:max_length] for note in notes
+    ]
+    for attempt in range(SLUG_ATTEMPTS):
+        for note, slug in zip(notes, allocate_slugs(bases, max_length)):
+            note.slug = slug
+        try:
+            with transaction.atomic():
+                return Note.objects.bulk_create(notes)
+        except IntegrityError:
+            if attempt == SLUG_ATTEMPTS - 1:
+                raise
+
+
+def import_lines(lines, author, batch_size):
+    """
+    Создаёт заметки author из строк NDJSON пачками по batch_size.
+
+    Строки читаются по мере обработки, файл целиком в память не
+    загружается. Если строка некорректна, поднимается InvalidLine, а уже
+    сохранённые пачки остаются. Возвращает число созданных заметок.
+    """
+    notes = parse_lines(lines, author)
+    created = 0
+    try:
+        while batch := list(islice(notes, batch_size)):
+            save_batch(batch)
+            created += len(batch)
+    except InvalidLine as error:
+        error.created = created
+        raise
+    finally:
+        # bulk_create() не отправляет сигналы, сбрасываем кэш сами.
+        bump_author_version(author.pk)
+    return created
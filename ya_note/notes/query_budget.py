@@ -0,0 +1,162 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import Signal, receiver
+
+logger = logging.getLogger(__name__)
+
+# Отправляется после каждого запроса, который прошёл через
+# QueryBudgetMiddleware, с аргументами request и stats.
+query_stats_recorded = Signal()
+
+# Статистика запроса, который сейчас обрабатывается в этом контексте.
+# Контекст asyncio и sync_to_async переносят значение между потоками,
+# поэтому одновременные запросы не смешивают свои счётчики.
+current_stats = ContextVar('current_stats', default=None)
+
+
+class QueryStats:
+    """Запросы к базе, сделанные при обработке одного HTTP-запроса."""
+
+    def __init__(self):
+        self.view_name = None
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        """
+        Повторяющиеся запросы: одинаковый SQL с разными параметрами.
+
+        Так обычно и выглядит N+1 в шаблоне.
+        """
+        return {sql: n for sql, n in self.statements.items() if n > 1}
+
+    @property
+    def budget(self):
+        return settings.QUERY_BUDGETS.get(self.view_name)
+
+    def __str__(self):
+        return (
+            f'{self.view_name}: {self.count} запросов, '
+            f'{self.duration * 1000:.1f} мс, '
+            f'повторов: {sum(self.duplicates.values())}'
+        )
+
+
+class QueryBudgetMiddleware:
+    """
+    Считает запросы к базе для каждого адреса.
+
+    Для разработки и тестов: включается настройкой QUERY_BUDGET_ENABLED
+    и предупреждает в лог, если view превысила лимит из QUERY_BUDGETS.
+    Ставится первой, чтобы учитывать и запросы других middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Под ASGI цепочка асинхронная: не заставляем Django оборачивать
+        # её в поток ради middleware, которая обычно выключена.
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.QUERY_BUDGET_ENABLED:
+            return self.get_response(request)
+        install_wrapper()
+        stats = QueryStats()
+        with recording(stats):
+            response = self.get_response(request)
+        self.check(request, stats)
+        query_stats_recorded.send(
+            sender=self.__class__, request=request, stats=stats
+        )
+        return response
+
+    async def __acall__(self, request):
+        if not settings.QUERY_BUDGET_ENABLED:
+            return await self.get_response(request)
+        # Соединения у каждого потока свои, а запросы асинхронной
+        # обработки идут в потоке sync_to_async.
+        await sync_to_async(install_wrapper)()
+        stats = QueryStats()
+        with recording(stats):
+            response = await self.get_response(request)
+        self.check(request, stats)
+        await query_stats_recorded.asend(
+            sender=self.__class__, request=request, stats=stats
+        )
+        return response
+
+    def check(self, request, stats):
+        if request.resolver_match is not None:
+            stats.view_name = request.resolver_match.view_name
+        if stats.budget is not None and stats.count > stats.budget:
+            logger.warning('Превышен лимит %s: %s', stats.budget, stats)
+        for sql, count in stats.duplicates.items():
+            logger.warning(
+                'Повтор в %s, %s раз: %s', stats.view_name, count, sql
+            )
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Обёртка, которая стоит на соединениях постоянно.
+
+    Снимать обёртки после запроса нельзя: execute_wrapper снимает
+    последнюю в списке, а не свою, и одновременные запросы в одном
+    потоке сняли бы чужую. Поэтому обёртка одна на соединение, а
+    учитывает запрос в статистике из current_stats, если она есть.
+    """
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def install_wrapper(connection=None):
+    """Ставит record_query на соединение или на все соединения потока."""
+    for conn in [connection] if connection else connections.all():
+        if record_query not in conn.execute_wrappers:
+            conn.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def install_on_connect(sender, connection, **kwargs):
+    install_wrapper(connection)
+
+
+@contextmanager
+def recording(stats):
+    """Пока открыт блок, запросы этого контекста учитываются в stats."""
+    token = current_stats.set(stats)
+    try:
+        yield
+    finally:
+        current_stats.reset(token)
@@ -0,0 +1,89 @@
+import re
+
+from django.db import connection, transaction
+
+from .models import Note
+
+FTS_TABLE = 'notes_note_fts'
+# Совпадение в заголовке весит больше, чем в тексте.
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+TERMS = re.compile(r'\w+')
+
+# Автор проверяется внутри MATCH, а его колонка не участвует в ранжировании.
+SEARCH_SQL = f"""
+    SELECT note.id, note.title, note.slug
+    FROM {FTS_TABLE}
+    JOIN notes_note AS note ON note.id = {FTS_TABLE}.rowid
+    WHERE {FTS_TABLE} MATCH %s
+    ORDER BY bm25({FTS_TABLE}, {TITLE_WEIGHT}, {TEXT_WEIGHT}, 0)
+    LIMIT %s
+"""
+
+
+def to_match_query(query):
+    """
+    Запрос пользователя в синтаксисе FTS5.
+
+    Каждое слово берётся в кавычки, поэтому операторы и скобки из
+    запроса не ломают поиск, и ищется как префикс: «замет» найдёт
+    «заметка». Слова объединяются через AND. Если слов нет, None.
+    """
+    terms = TERMS.findall(query)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_notes(author, query, limit):
+    """
+    Заметки автора, подходящие под запрос, от самых релевантных.
+
+    Слова ищутся только в заголовке и тексте, а номер автора в колонке
+    author_id, так что FTS5 сразу отбрасывает заметки других авторов.
+    """
+    match = to_match_query(query)
+    if match is None:
+        return []
+    match = f'author_id : "{author.pk}" AND {{title text}} : ({match})'
+    return list(Note.objects.raw(SEARCH_SQL, [match, limit]))
+
+
+def rebuild_index(batch_size, progress=None):
+    """
+    Пересобирает индекс заново пачками по batch_size заметок.
+
+    Очистка и все пачки идут в одной транзакции: иначе триггеры успели
+    бы изменить индекс между пачками, и часть заметок попала бы в него
+    дважды или не попала бы вовсе. Запись в базу на время пересборки
+    ждёт её окончания. Возвращает число проиндексированных заметок.
+    """
+    done = 0
+    last_pk = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')"
+        )
+        while True:
+            pks = list(
+                Note.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE}(rowid, title, text, author_id) '
+                'SELECT id, title, text, author_id FROM notes_note '
+                'WHERE id BETWEEN %s AND %s',
+                [pks[0], pks[-1]],
+            )
+            done += len(pks)
+            last_pk = pks[-1]
+            if progress is not None:
+                progress(done)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+        )
+    return done
@@ -0,0 +1,49 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_author_version, invalidate_user_cache
+from .models import Note
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def reset_author_cache(sender, instance, using, **kwargs):
+    """
+    Создание, правка и удаление заметки, в том числе из NoteCreate,
+    NoteUpdate и NoteDelete, сбрасывают кэш её автора.
+
+    Версия сбрасывается после фиксации транзакции: иначе параллельный
+    запрос успел бы положить старые строки в кэш под новой версией.
+    """
+    transaction.on_commit(
+        partial(bump_author_version, instance.author_id), using=using
+    )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def reset_user_cache(sender, instance, using, **kwargs):
+    """
+    Пароль, активность или права пользователя могли измениться.
+
+    Запись сбрасывается после фиксации: иначе параллельный запрос успел
+    бы положить в кэш прежнюю строку ещё на AUTH_USER_CACHE_TIMEOUT.
+    """
+    transaction.on_commit(
+        partial(invalidate_user_cache, instance.pk), using=using
+    )
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Прагмы из NOTES_SQLITE_PRAGMAS для каждого нового соединения."""
+    if connection.vendor != 'sqlite' or not settings.NOTES_SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.NOTES_SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
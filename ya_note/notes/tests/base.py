@@ -1,24 +1,19 @@
-from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from notes.models import Note
-
-User = get_user_model()
+from notes.tests.factories import FAST_PASSWORD_HASHERS, make_users
 
 
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
 class BaseNoteTestCase(TestCase):
     """База для всех unittest-тестов YaNote."""
 
     @classmethod
     def setUpTestData(cls):
-        cls.author = User.objects.create_user(
-            username="author",
-            password="pass",
-        )
-        cls.reader = User.objects.create_user(
-            username="reader",
-            password="pass",
+        cls.author, cls.reader = make_users(
+            ("author", "reader"), password="pass"
         )
 
         cls.note = Note.objects.create(
@@ -33,6 +28,9 @@ class BaseNoteTestCase(TestCase):
         cls.list_url = reverse("notes:list")
         cls.add_url = reverse("notes:add")
         cls.success_url = reverse("notes:success")
+        cls.search_url = reverse("notes:search")
+        cls.export_url = reverse("notes:export")
+        cls.import_url = reverse("notes:import")
 
         cls.detail_url = reverse("notes:detail", args=(cls.note.slug,))
         cls.edit_url = reverse("notes:edit", args=(cls.note.slug,))
@@ -48,3 +46,7 @@ class BaseNoteTestCase(TestCase):
 
         cls.reader_client = Client()
         cls.reader_client.force_login(cls.reader)
+
+    def setUp(self):
+        # Откат транзакции теста не отправляет сигналы, кэш чистим сами.
+        cache.clear()
@@ -0,0 +1,33 @@
+import pytest
+
+from notes.query_budget import query_stats_recorded
+
+
+@pytest.fixture(autouse=True)
+def query_budget(request, settings):
+    """
+    Проваливает тест, если view сделала больше запросов, чем разрешено.
+    View с лимитом не должна и повторять один и тот же SQL: обычно это
+    N+1 в шаблоне.
+
+    Лимиты берутся из settings.QUERY_BUDGETS, для отдельного теста их
+    можно переопределить меткой @pytest.mark.query_budget(view, limit).
+    """
+    settings.QUERY_BUDGET_ENABLED = True
+    budgets = dict(settings.QUERY_BUDGETS)
+    for marker in reversed(list(request.node.iter_markers("query_budget"))):
+        budgets[marker.args[0]] = marker.args[1]
+    exceeded = []
+
+    def check(stats, **kwargs):
+        budget = budgets.get(stats.view_name)
+        if budget is not None and stats.count > budget:
+            exceeded.append(f"лимит {budget}: {stats}")
+        if budget is not None and stats.duplicates:
+            exceeded.append(f"повторы: {stats} {stats.duplicates}")
+
+    query_stats_recorded.connect(check, weak=False)
+    yield
+    query_stats_recorded.disconnect(check)
+    if exceeded:
+        pytest.fail("\n".join(exceeded), pytrace=False)
@@ -0,0 +1,47 @@
+"""
+Тестовые данные одним INSERT на модель.
+
+Фабрики годятся и для пары объектов, и для десятков тысяч: объекты
+собираются в памяти и сохраняются через bulk_create(), пароль
+хэшируется один раз на вызов. Note.save() и сигналы при этом не
+вызываются, поэтому слаги задаются явно, а кэш автора фабрика
+сбрасывает сама.
+"""
+from itertools import count as numbers
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from notes.cache import bump_author_version
+from notes.models import Note
+
+User = get_user_model()
+
+# Быстрый хэшер для тестов: PBKDF2 тратит на пароль сотни миллисекунд.
+FAST_PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# Номера для слагов, уникальные на весь прогон тестов.
+slug_numbers = numbers()
+
+
+def make_users(usernames, password=None):
+    """Пользователи с именами usernames; без password — без пароля."""
+    hashed = make_password(password)
+    return User.objects.bulk_create(
+        User(username=username, password=hashed) for username in usernames
+    )
+
+
+def make_notes(author, count, title="Заметка", text="Текст"):
+    """Заметки author в количестве count с заголовками «title N»."""
+    notes = Note.objects.bulk_create(
+        Note(
+            title=f"{title} {number}",
+            text=text,
+            slug=f"note-{number}",
+            author=author,
+        )
+        for number in (next(slug_numbers) for _ in range(count))
+    )
+    bump_author_version(author.pk)
+    return notes
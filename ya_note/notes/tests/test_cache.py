@@ -0,0 +1,127 @@
+import io
+from http import HTTPStatus
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.core.management import call_command
+from django.urls import reverse
+
+from notes.cache import get_stats
+from notes.tests.base import BaseNoteTestCase
+
+migration = import_module("notes.migrations.0004_cached_backend_sessions")
+
+
+class TestNotesCache(BaseNoteTestCase):
+    def test_list_and_detail_served_from_cache(self):
+        self.author_client.get(self.list_url)
+        self.author_client.get(self.detail_url)
+
+        # Сессия и пользователь тоже в кэше.
+        with self.assertNumQueries(0):
+            self.author_client.get(self.list_url)
+        with self.assertNumQueries(0):
+            response = self.author_client.get(self.detail_url)
+        self.assertEqual(response.context["note"], self.note)
+
+    def test_edit_invalidates_author_cache(self):
+        self.author_client.get(self.list_url)
+        self.author_client.get(self.detail_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author_client.post(
+                self.edit_url,
+                {
+                    "title": "Новый заголовок",
+                    "text": "Текст",
+                    "slug": "author-note",
+                },
+            )
+
+        response = self.author_client.get(self.list_url)
+        self.assertContains(response, "Новый заголовок")
+        response = self.author_client.get(self.detail_url)
+        self.assertContains(response, "Новый заголовок")
+
+    def test_delete_invalidates_author_cache(self):
+        self.author_client.get(self.detail_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author_client.post(self.delete_url)
+
+        response = self.author_client.get(self.detail_url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = self.author_client.get(self.list_url)
+        self.assertNotContains(response, "Заметка автора")
+
+    def test_cache_reset_after_commit(self):
+        self.author_client.get(self.detail_url)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.note.text = "Новый текст"
+            self.note.save()
+            # Пока правка не зафиксирована, кэш отдаёт прежнюю заметку.
+            response = self.author_client.get(self.detail_url)
+            self.assertEqual(response.context["note"].text, "Текст")
+        for callback in callbacks:
+            callback()
+
+        response = self.author_client.get(self.detail_url)
+        self.assertEqual(response.context["note"].text, "Новый текст")
+
+    def test_reader_does_not_get_author_notes_from_cache(self):
+        self.author_client.get(self.detail_url)
+
+        response = self.reader_client.get(self.detail_url)
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_stats_count_hits_and_misses(self):
+        self.author_client.get(self.detail_url)
+        self.author_client.get(self.detail_url)
+        self.author_client.get(reverse("notes:detail", args=("missing",)))
+
+        self.assertEqual(get_stats()["detail"], (1, 2))
+
+        out = io.StringIO()
+        call_command("notes_cache_stats", "--reset", stdout=out)
+        self.assertIn("detail", out.getvalue())
+        self.assertEqual(get_stats()["detail"], (0, 0))
+
+
+class TestAuthCache(BaseNoteTestCase):
+    def test_password_change_ends_cached_sessions(self):
+        self.author_client.get(self.list_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.set_password("new-password")
+            self.author.save()
+
+        response = self.author_client.get(self.list_url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_deactivated_user_logged_out(self):
+        self.author_client.get(self.list_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.is_active = False
+            self.author.save()
+
+        response = self.author_client.get(self.list_url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_sessions_of_plain_model_backend_moved(self):
+        self.client.force_login(
+            self.author, backend=migration.MODEL_BACKEND
+        )
+        self.client.get(self.list_url)
+
+        migration.use_cached_backend(apps, None)
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            self.client.session[BACKEND_SESSION_KEY],
+            migration.CACHED_BACKEND,
+        )
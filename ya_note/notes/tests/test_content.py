@@ -1,5 +1,16 @@
+import base64
+import json
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.http import Http404
+from django.test import AsyncRequestFactory, override_settings
+
+from notes.async_views import AsyncNoteDetail, AsyncNotesList
 from notes.forms import NoteForm
+from notes.models import Note
+from notes.query_budget import QueryBudgetMiddleware, query_stats_recorded
 from notes.tests.base import BaseNoteTestCase
+from notes.tests.factories import make_notes
 
 
 class TestContent(BaseNoteTestCase):
@@ -13,6 +24,77 @@ class TestContent(BaseNoteTestCase):
         object_list = response.context["object_list"]
         self.assertNotIn(self.note, object_list)
 
+    def test_list_loads_only_listed_fields(self):
+        response = self.author_client.get(self.list_url)
+        note = response.context["object_list"][0]
+        self.assertEqual(note.get_deferred_fields(), {"text", "author_id"})
+
+    @override_settings(NOTES_PER_PAGE=2)
+    def test_list_is_paginated(self):
+        make_notes(self.author, 3)
+        response = self.author_client.get(self.list_url)
+        page = response.context["page_obj"]
+        self.assertEqual(len(page.object_list), 2)
+        self.assertTrue(page.has_next)
+
+        response = self.author_client.get(
+            self.list_url, {"cursor": page.next_cursor}
+        )
+        self.assertEqual(len(response.context["page_obj"].object_list), 2)
+
+        response = self.author_client.get(self.list_url, {"cursor": "x"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_forged_cursor_is_not_found(self):
+        payloads = (
+            ["n", [None]],
+            ["p", [None]],
+            ["n", [True]],
+            ["n", ["x"]],
+            ["n", [[1]]],
+            ["n", [1, 2]],
+            ["n", [10**30]],
+        )
+        for payload in payloads:
+            cursor = base64.urlsafe_b64encode(
+                json.dumps(payload).encode()
+            ).decode()
+            with self.subTest(payload=payload):
+                response = self.author_client.get(
+                    self.list_url, {"cursor": cursor}
+                )
+                self.assertEqual(response.status_code, 404)
+
+    @override_settings(NOTES_PER_PAGE=50)
+    def test_list_pages_cover_all_notes(self):
+        notes = make_notes(self.author, 1000)
+        seen = []
+        cursor = ""
+        while cursor is not None:
+            page = self.author_client.get(
+                self.list_url, {"cursor": cursor}
+            ).context["page_obj"]
+            seen.extend(note.pk for note in page.object_list)
+            cursor = page.next_cursor
+        self.assertEqual(seen, [self.note.pk] + [note.pk for note in notes])
+
+    def test_notes_count_cached_and_invalidated(self):
+        self.author_client.get(self.list_url)
+        # Сессия, пользователь, страница и число заметок — из кэша.
+        with self.assertNumQueries(0):
+            response = self.author_client.get(self.list_url)
+        self.assertEqual(response.context["notes_count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Note.objects.create(title="Ещё", slug="more", author=self.author)
+        response = self.author_client.get(self.list_url)
+        self.assertEqual(response.context["notes_count"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.note.delete()
+        response = self.author_client.get(self.list_url)
+        self.assertEqual(response.context["notes_count"], 1)
+
     def test_pages_contain_form(self):
         pages = (
             self.add_url,
@@ -23,3 +105,58 @@ class TestContent(BaseNoteTestCase):
                 response = self.author_client.get(url)
                 self.assertIn("form", response.context)
                 self.assertIsInstance(response.context["form"], NoteForm)
+
+    def async_get(self, view_class, url, user, **kwargs):
+        request = AsyncRequestFactory().get(url)
+
+        async def auser():
+            return user
+
+        request.auser = auser
+        return async_to_sync(view_class.as_view())(request, **kwargs)
+
+    def test_async_views_show_author_note(self):
+        response = self.async_get(AsyncNotesList, self.list_url, self.author)
+        self.assertContains(response, self.note.title)
+
+        response = self.async_get(
+            AsyncNoteDetail, self.detail_url, self.author, slug=self.note.slug
+        )
+        self.assertContains(response, self.note.text)
+        self.assertTrue(response.has_header("ETag"))
+
+    def test_async_detail_hides_foreign_note(self):
+        with self.assertRaises(Http404):
+            self.async_get(
+                AsyncNoteDetail,
+                self.detail_url,
+                self.reader,
+                slug=self.note.slug,
+            )
+
+    @override_settings(QUERY_BUDGET_ENABLED=True)
+    async def test_query_budget_counts_async_requests(self):
+        recorded = []
+
+        def record(stats, **kwargs):
+            recorded.append(stats)
+
+        await self.async_client.aforce_login(self.author)
+        query_stats_recorded.connect(record)
+        try:
+            response = await self.async_client.get(self.detail_url)
+        finally:
+            query_stats_recorded.disconnect(record)
+
+        self.assertEqual(response.status_code, 200)
+        (stats,) = recorded
+        self.assertEqual(stats.view_name, "notes:detail")
+        self.assertGreater(stats.count, 0)
+
+    def test_query_budget_middleware_keeps_chain_async(self):
+        async def get_response(request):
+            pass
+
+        self.assertTrue(
+            iscoroutinefunction(QueryBudgetMiddleware(get_response))
+        )
@@ -0,0 +1,16 @@
+from notes.models import Note
+from notes.tests.base import BaseNoteTestCase
+
+
+class TestIndexes(BaseNoteTestCase):
+    def test_author_slug_lookup_uses_index(self):
+        plan = Note.objects.filter(
+            author=self.author, slug=self.note.slug
+        ).explain()
+        self.assertNotIn("SCAN", plan)
+        self.assertIn("INDEX", plan)
+
+    def test_author_notes_use_index(self):
+        plan = Note.objects.filter(author=self.author).explain()
+        self.assertNotIn("SCAN", plan)
+        self.assertIn("SEARCH", plan)
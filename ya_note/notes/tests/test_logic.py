@@ -1,11 +1,16 @@
+import io
 from http import HTTPStatus
 
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from pytils.translit import slugify
 
 from notes.forms import WARNING
 from notes.models import Note
 from notes.tests.base import BaseNoteTestCase
 
+User = get_user_model()
+
 
 class TestLogic(BaseNoteTestCase):
     def test_auth_can_create_note(self):
@@ -124,3 +129,25 @@ class TestLogic(BaseNoteTestCase):
         response = self.reader_client.post(self.delete_url)
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertEqual(Note.objects.count(), before_count)
+
+    def test_seed_notes_creates_notes(self):
+        before = Note.objects.count()
+        call_command(
+            "seed_notes", users=3, notes=50, batch_size=20,
+            stdout=io.StringIO(),
+        )
+        self.assertEqual(Note.objects.count(), before + 50)
+        self.assertEqual(
+            Note.objects.filter(slug__startswith="seed-").count(), 50
+        )
+
+    def test_seed_notes_skips_taken_names(self):
+        User.objects.create(username="user1")
+        Note.objects.create(
+            title="Засеянная", slug="seed-1", author=self.author
+        )
+        call_command(
+            "seed_notes", users=2, notes=2, stdout=io.StringIO()
+        )
+        self.assertTrue(User.objects.filter(username="user3").exists())
+        self.assertTrue(Note.objects.filter(slug="seed-3").exists())
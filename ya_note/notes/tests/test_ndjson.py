@@ -0,0 +1,94 @@
+import io
+import json
+import os
+import tempfile
+from http import HTTPStatus
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from notes.models import Note
+from notes.tests.base import BaseNoteTestCase
+
+
+def ndjson(*notes):
+    return "".join(
+        json.dumps(note, ensure_ascii=False) + "\n" for note in notes
+    ).encode()
+
+
+class TestNdjson(BaseNoteTestCase):
+    def upload(self, content):
+        return self.author_client.post(
+            self.import_url,
+            {"file": SimpleUploadedFile("notes.ndjson", content)},
+        )
+
+    def test_export_streams_own_notes(self):
+        Note.objects.create(title="Чужая", text="Т", author=self.reader)
+
+        response = self.author_client.get(self.export_url)
+
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [
+                {
+                    "title": "Заметка автора",
+                    "text": "Текст",
+                    "slug": "author-note",
+                }
+            ],
+        )
+
+    def test_import_allocates_slugs_in_batches(self):
+        content = ndjson(
+            {"title": "Импорт", "text": "Т"},
+            {"title": "Импорт", "text": "Т"},
+            {"title": "Своя", "text": "Т", "slug": "own-slug"},
+            {"title": "Чужой слаг", "text": "Т", "slug": self.note.slug},
+        )
+
+        with self.settings(NOTES_IMPORT_BATCH_SIZE=3):
+            response = self.upload(content)
+
+        self.assertRedirects(response, self.success_url)
+        self.assertEqual(
+            list(
+                Note.objects.filter(author=self.author)
+                .order_by("pk")
+                .values_list("slug", flat=True)
+            ),
+            ["author-note", "import", "import-2", "own-slug", "author-note-2"],
+        )
+
+    def test_invalid_line_reported_with_number(self):
+        content = ndjson({"title": "Первая", "text": "Т"}) + b"{oops\n"
+
+        with self.settings(NOTES_IMPORT_BATCH_SIZE=1):
+            response = self.upload(content)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFormError(
+            response.context["form"],
+            "file",
+            "строка 2: некорректный JSON. Загружено заметок: 1.",
+        )
+        self.assertTrue(Note.objects.filter(title="Первая").exists())
+
+    def test_commands_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "notes.ndjson")
+            call_command("export_notes", "author", output=path)
+            Note.objects.all().delete()
+
+            out = io.StringIO()
+            call_command("import_notes", "reader", path, stdout=out)
+
+        self.assertIn("Загружено заметок: 1", out.getvalue())
+        note = Note.objects.get()
+        self.assertEqual(
+            (note.title, note.text, note.slug, note.author),
+            (self.note.title, self.note.text, self.note.slug, self.reader),
+        )
@@ -0,0 +1,62 @@
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from notes.models import Note
+from notes.replica import (
+    PRIMARY,
+    REPLICA,
+    STICKY_COOKIE,
+    ReplicaRouter,
+    StickyPrimaryMiddleware,
+)
+
+
+class TestReplicaRouting(SimpleTestCase):
+    router = ReplicaRouter()
+
+    def handle(self, request, write=False):
+        seen = []
+
+        def view(request):
+            if write:
+                self.router.db_for_write(Note)
+            seen.append(self.router.db_for_read(Note))
+            return HttpResponse()
+
+        return StickyPrimaryMiddleware(view)(request), seen
+
+    async def test_async_write_sticks_client_to_primary(self):
+        seen = []
+
+        async def view(request):
+            self.router.db_for_write(Note)
+            seen.append(self.router.db_for_read(Note))
+            return HttpResponse()
+
+        middleware = StickyPrimaryMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        response = await middleware(RequestFactory().post("/"))
+
+        self.assertEqual(seen, [PRIMARY])
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.router.db_for_read(Note), REPLICA)
+
+    def test_reads_go_to_replica(self):
+        response, seen = self.handle(RequestFactory().get("/"))
+
+        self.assertEqual(seen, [REPLICA])
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    @override_settings(NOTES_PRIMARY_STICKY_SECONDS=30)
+    def test_write_sticks_client_to_primary(self):
+        response, seen = self.handle(RequestFactory().post("/"), write=True)
+
+        self.assertEqual(seen, [PRIMARY])
+        self.assertEqual(response.cookies[STICKY_COOKIE]["max-age"], 30)
+
+        request = RequestFactory().get("/")
+        request.COOKIES[STICKY_COOKIE] = "1"
+        response, seen = self.handle(request)
+        self.assertEqual(seen, [PRIMARY])
@@ -1,5 +1,7 @@
 from http import HTTPStatus
 
+from notes.cache import bump_author_version
+from notes.models import Note
 from notes.tests.base import BaseNoteTestCase
 
 
@@ -9,7 +11,15 @@ class TestRoutes(BaseNoteTestCase):
         self.assertEqual(response.status_code, HTTPStatus.OK)
 
     def test_pages_available_for_auth_user(self):
-        for url in (self.list_url, self.add_url, self.success_url):
+        urls = (
+            self.list_url,
+            self.add_url,
+            self.success_url,
+            self.search_url,
+            self.export_url,
+            self.import_url,
+        )
+        for url in urls:
             with self.subTest(url=url):
                 response = self.author_client.get(url)
                 self.assertEqual(response.status_code, HTTPStatus.OK)
@@ -30,6 +40,9 @@ class TestRoutes(BaseNoteTestCase):
             self.list_url,
             self.add_url,
             self.success_url,
+            self.search_url,
+            self.export_url,
+            self.import_url,
             self.detail_url,
             self.edit_url,
             self.delete_url,
@@ -50,3 +63,37 @@ class TestRoutes(BaseNoteTestCase):
         response = self.client.post(self.logout_url)
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertTemplateUsed(response, "registration/logout.html")
+
+    def test_detail_not_modified_until_note_changed(self):
+        etag = self.author_client.get(self.detail_url)["ETag"]
+
+        response = self.author_client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.note.text = "Новый текст"
+            self.note.save()
+        response = self.author_client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_detail_etag_after_update_without_signals(self):
+        etag = self.author_client.get(self.detail_url)["ETag"]
+
+        # queryset.update() сигналов не отправляет: заметка и её ETag
+        # берутся из кэша, пока его не сбросят явно (см. настройку
+        # NOTES_CACHE_TIMEOUT).
+        Note.objects.filter(pk=self.note.pk).update(text="Новый текст")
+        response = self.author_client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+        bump_author_version(self.author.pk)
+        response = self.author_client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
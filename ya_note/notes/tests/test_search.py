@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+
+from notes.models import Note
+from notes.search import search_notes, to_match_query
+from notes.tests.base import BaseNoteTestCase
+from notes.tests.factories import make_notes
+
+
+class TestSearch(BaseNoteTestCase):
+    def search(self, query):
+        response = self.author_client.get(self.search_url, {"q": query})
+        return list(response.context["object_list"])
+
+    def test_title_match_ranked_above_text_match(self):
+        in_text = Note.objects.create(
+            title="Покупки",
+            text="Не забыть про редиску",
+            slug="shopping",
+            author=self.author,
+        )
+        in_title = Note.objects.create(
+            title="Редиска",
+            text="Посадить в мае",
+            slug="radish",
+            author=self.author,
+        )
+        self.assertEqual(self.search("редиск"), [in_title, in_text])
+
+    def test_only_own_notes_found(self):
+        Note.objects.create(
+            title="Чужая заметка", slug="foreign", author=self.reader
+        )
+        self.assertEqual(self.search("заметка"), [self.note])
+
+    def test_author_number_is_not_searched_as_text(self):
+        Note.objects.create(
+            title=f"Квартира {self.author.pk}",
+            slug="flat",
+            author=self.reader,
+        )
+        self.assertEqual(self.search(str(self.author.pk)), [])
+
+    def test_index_follows_update_and_delete(self):
+        self.note.title = "Переименованная"
+        self.note.save()
+        self.assertEqual(self.search("автора"), [])
+        self.assertEqual(self.search("переименованная"), [self.note])
+
+        self.note.delete()
+        self.assertEqual(self.search("переименованная"), [])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(to_match_query('текст" OR (*'), '"текст"* "OR"*')
+        self.assertIsNone(to_match_query("  *** "))
+        self.assertEqual(self.search('"текст" ('), [self.note])
+
+    def test_rebuild_command_restores_index(self):
+        make_notes(self.author, 5, title="Пачка")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO notes_note_fts(notes_note_fts) "
+                "VALUES ('delete-all')"
+            )
+        self.assertEqual(search_notes(self.author, "пачка", 10), [])
+
+        out = StringIO()
+        call_command("rebuild_notes_search", batch_size=2, stdout=out)
+
+        self.assertIn("заметок в индексе: 6", out.getvalue())
+        self.assertEqual(len(search_notes(self.author, "пачка", 10)), 5)
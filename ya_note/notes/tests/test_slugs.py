@@ -0,0 +1,113 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+from pytils.translit import slugify
+
+from notes import models
+from notes.models import Note
+
+User = get_user_model()
+
+PARALLEL_CREATES = 8
+# Конструктор FTS5 читает таблицу настроек индекса, и если она занята,
+# SQLite сообщает не о блокировке, а о неудачном создании таблицы.
+LOCK_ERRORS = ("locked", "vtable constructor failed")
+
+
+def is_locked(error):
+    return any(message in str(error) for message in LOCK_ERRORS)
+
+
+def wait_for_lock(execute, sql, params, many, context):
+    """
+    Ждём чужую блокировку таблицы, как это делает busy_timeout.
+
+    Тестовая база SQLite живёт в общей памяти, и там занятая таблица
+    сразу даёт ошибку, а не ожидание, как у файла на диске. Внутри
+    транзакции не ждём: она уже держит свои блокировки, и две такие
+    транзакции ждали бы друг друга вечно. Её целиком повторяет create().
+    """
+    while True:
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as error:
+            if not is_locked(error) or connection.in_atomic_block:
+                raise
+            time.sleep(0.001)
+
+
+class TestSlugAllocation(TransactionTestCase):
+    def test_parallel_creates_get_distinct_slugs(self):
+        author = User.objects.create(username="author")
+        title = "Одинаковый заголовок"
+        barrier = threading.Barrier(PARALLEL_CREATES)
+        errors = []
+
+        def create():
+            try:
+                barrier.wait()
+                with connection.execute_wrapper(wait_for_lock):
+                    while True:
+                        try:
+                            Note.objects.create(
+                                title=title, text="Текст", author=author
+                            )
+                            break
+                        except OperationalError as error:
+                            if not is_locked(error):
+                                raise
+                            time.sleep(0.001)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=create) for _ in range(PARALLEL_CREATES)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        base = slugify(title)
+        self.assertCountEqual(
+            Note.objects.values_list("slug", flat=True),
+            [base] + [f"{base}-{n}" for n in range(2, PARALLEL_CREATES + 1)],
+        )
+
+    def test_next_suffix_after_taken_ones(self):
+        author = User.objects.create(username="author")
+        for slug in ("zametka", "zametka-2", "zametka-7", "zametka-x"):
+            Note.objects.create(
+                title="Заметка", text="Текст", slug=slug, author=author
+            )
+
+        note = Note.objects.create(
+            title="Заметка", text="Текст", author=author
+        )
+
+        self.assertEqual(note.slug, "zametka-8")
+
+    def test_slug_taken_after_allocation_is_retried(self):
+        author = User.objects.create(username="author")
+        taken = Note.objects.create(title="Заметка", text="Т", author=author)
+        allocate = models.next_free_slug
+        stale = iter([taken.slug])
+
+        def allocate_stale_first(*args, **kwargs):
+            return next(stale, None) or allocate(*args, **kwargs)
+
+        with mock.patch.object(
+            models, "next_free_slug", side_effect=allocate_stale_first
+        ):
+            note = Note.objects.create(
+                title="Заметка", text="Т", author=author
+            )
+
+        self.assertEqual(note.slug, f"{taken.slug}-2")
@@ -1,9 +1,111 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.http import Http404, StreamingHttpResponse
 from django.urls import reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.views import generic
 
-from .forms import NoteForm
+from .cache import aget_or_compute, get_notes_count, get_or_compute
+from .forms import WARNING, ImportForm, NoteForm
 from .models import Note
+from .ndjson import InvalidLine, export_lines, import_lines
+from .pagination import InvalidCursor, KeysetPage, KeysetPaginator
+from .search import search_notes
+
+
+ETAG_FIELDS = ('pk', 'title', 'text', 'slug')
+LIST_FIELDS = ('id', 'slug', 'title')
+
+
+def get_page(queryset, ordering, per_page, cursor):
+    """Страница списка по курсору из запроса."""
+    paginator = KeysetPaginator(queryset, ordering, per_page)
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        raise Http404('Некорректный курсор.')
+
+
+async def aget_page(queryset, ordering, per_page, cursor):
+    """Асинхронный get_page()."""
+    paginator = KeysetPaginator(queryset, ordering, per_page)
+    try:
+        return await paginator.apage(cursor)
+    except InvalidCursor:
+        raise Http404('Некорректный курсор.')
+
+
+def note_etag(note):
+    """Тег ETag заметки: отпечаток значений её полей ETAG_FIELDS."""
+    values = tuple(getattr(note, field) for field in ETAG_FIELDS)
+    return quote_etag(hashlib.md5(repr(values).encode()).hexdigest())
+
+
+def list_queryset(author):
+    """
+    Заметки автора без текста: в списке нужны только id, slug и
+    заголовок, а тексты у заметок бывают большими.
+    """
+    return Note.objects.filter(author=author).only(*LIST_FIELDS)
+
+
+def list_page(author, cursor):
+    """
+    Страница списка заметок автора из его кэша.
+
+    Кэшируются загруженные записи страницы и признак предыдущей;
+    пагинатор собирается заново, запросов он не делает.
+    """
+    queryset = list_queryset(author)
+
+    def compute():
+        page = get_page(queryset, ('pk',), settings.NOTES_PER_PAGE, cursor)
+        return list(page.object_list), page.has_previous
+
+    rows, has_previous = get_or_compute(author.pk, 'list', cursor, compute)
+    paginator = KeysetPaginator(queryset, ('pk',), settings.NOTES_PER_PAGE)
+    return KeysetPage(paginator, rows, has_previous)
+
+
+async def alist_page(author, cursor):
+    """Асинхронный list_page()."""
+    queryset = list_queryset(author)
+
+    async def compute():
+        page = await aget_page(
+            queryset, ('pk',), settings.NOTES_PER_PAGE, cursor
+        )
+        return page.object_list, page.has_previous
+
+    rows, has_previous = await aget_or_compute(
+        author.pk, 'list', cursor, compute
+    )
+    paginator = KeysetPaginator(queryset, ('pk',), settings.NOTES_PER_PAGE)
+    return KeysetPage(paginator, rows, has_previous)
+
+
+def get_note(author, slug):
+    """Заметка автора из его кэша или None, если такой нет."""
+    return get_or_compute(
+        author.pk,
+        'detail',
+        slug,
+        Note.objects.filter(author=author, slug=slug).first,
+    )
+
+
+async def aget_note(author, slug):
+    """Асинхронный get_note()."""
+    return await aget_or_compute(
+        author.pk,
+        'detail',
+        slug,
+        Note.objects.filter(author=author, slug=slug).afirst,
+    )
 
 
 class Home(generic.TemplateView):
@@ -26,22 +128,35 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class NoteFormMixin:
+    """Сохранение формы заметки с учётом гонки за слаг."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        """
+        Уникальность слага форма проверяет заранее, но параллельный
+        запрос мог занять его между проверкой и записью. Тогда вместо
+        ошибки сервера показываем форме то же сообщение.
+        """
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            form.add_error('slug', form.cleaned_data['slug'] + WARNING)
+            return self.form_invalid(form)
+
+
+class NoteCreate(NoteBase, NoteFormMixin, generic.CreateView):
+    """Добавление заметки."""
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteBase, NoteFormMixin, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -53,7 +168,92 @@ class NotesList(NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
 
+    def get_queryset(self):
+        self.page = list_page(
+            self.request.user, self.request.GET.get('cursor', '')
+        )
+        return self.page.object_list
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_obj'] = self.page
+        context['notes_count'] = get_notes_count(self.request.user)
+        return context
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search_notes(
+            self.request.user, self.query, settings.NOTES_SEARCH_LIMIT
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
+
 
 class NoteDetail(NoteBase, generic.DetailView):
-    """Заметка подробно."""
+    """
+    Заметка подробно.
+
+    Заметка берётся из кэша автора, тег ETag считается по ней же, так
+    что при попадании в кэш к таблице заметок запросов нет.
+    """
     template_name = 'notes/detail.html'
+
+    def get_object(self, queryset=None):
+        note = get_note(self.request.user, self.kwargs['slug'])
+        if note is None:
+            raise Http404('Заметка не найдена.')
+        return note
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        etag = note_etag(self.object)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self.render_to_response(
+                self.get_context_data(object=self.object)
+            )
+        response.headers['ETag'] = etag
+        return response
+
+
+class NoteExport(LoginRequiredMixin, generic.View):
+    """Выгрузка всех заметок пользователя в NDJSON."""
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            export_lines(request.user, settings.NOTES_EXPORT_CHUNK_SIZE),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="notes.ndjson"'
+        )
+        return response
+
+
+class NoteImport(LoginRequiredMixin, generic.FormView):
+    """Загрузка заметок из NDJSON, например выгруженных NoteExport."""
+    template_name = 'notes/import.html'
+    form_class = ImportForm
+    success_url = reverse_lazy('notes:success')
+
+    def form_valid(self, form):
+        try:
+            import_lines(
+                form.cleaned_data['file'],
+                self.request.user,
+                settings.NOTES_IMPORT_BATCH_SIZE,
+            )
+        except InvalidLine as error:
+            form.add_error(
+                'file', f'{error}. Загружено заметок: {error.created}.'
+            )
+            return self.form_invalid(form)
+        return super().form_valid(form)
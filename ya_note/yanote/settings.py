@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -22,6 +23,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'notes.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,6 +61,71 @@ DATABASES = {
     }
 }
 
+# Профиль SQLite для продакшена: постоянные соединения, запись в
+# транзакциях BEGIN IMMEDIATE, чтобы читающая транзакция не упиралась
+# в блокировку при переходе к записи, и прагмы, которые notes.signals
+# применяет к каждому новому соединению.
+NOTES_SQLITE_PROFILE = os.environ.get('NOTES_SQLITE_PROFILE') == '1'
+NOTES_SQLITE_PRAGMAS = {}
+if NOTES_SQLITE_PROFILE:
+    DATABASES['default'].update(
+        CONN_MAX_AGE=10 * 60,
+        CONN_HEALTH_CHECKS=True,
+        OPTIONS={'transaction_mode': 'IMMEDIATE'},
+    )
+    NOTES_SQLITE_PRAGMAS = {
+        # Читатели не блокируют писателя и наоборот.
+        'journal_mode': 'WAL',
+        # В режиме WAL база остаётся целостной, при сбое питания можно
+        # потерять лишь последние транзакции.
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+        # Отрицательное значение — размер в КиБ, а не в страницах.
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+    }
+
+# Реплика для чтения (см. notes.replica). Локально это копия основной
+# базы, которую обновляет команда sync_replica.
+NOTES_REPLICA_DB = os.environ.get('NOTES_REPLICA_DB')
+# Сколько секунд после записи клиент читает с основной базы.
+NOTES_PRIMARY_STICKY_SECONDS = 10
+if NOTES_REPLICA_DB:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': NOTES_REPLICA_DB,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['notes.replica.ReplicaRouter']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index(
+            'django.contrib.sessions.middleware.SessionMiddleware'
+        ),
+        'notes.replica.StickyPrimaryMiddleware',
+    )
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Сессии читаются из кэша, в базу только пишутся и читаются при промахе.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Пользователь запроса тоже берётся из кэша. Сессии, открытые с
+# ModelBackend, переводит на этот бэкенд миграция
+# notes.0004_cached_backend_sessions.
+AUTHENTICATION_BACKENDS = [
+    'notes.backends.CachedModelBackend',
+]
+# С LocMemCache у каждого процесса свой кэш, и сброс при изменении
+# пользователя виден только в нём: другие процессы узнают о смене пароля
+# или блокировке лишь через AUTH_USER_CACHE_TIMEOUT. В продакшене с
+# несколькими процессами нужен общий кэш (Redis, Memcached).
+AUTH_USER_CACHE_TIMEOUT = 5 * 60
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +154,29 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_PER_PAGE = 50
+# Кэш списка, заметок и их числа у каждого автора свой и сбрасывается
+# при любом изменении его заметок через save() и delete(). Изменения в
+# обход сигналов (queryset.update(), SQL) вместе с ETag страницы заметки
+# видны только после bump_author_version() или по истечении таймаута.
+NOTES_CACHE_TIMEOUT = 60 * 60
+NOTES_SEARCH_LIMIT = 50
+NOTES_EXPORT_CHUNK_SIZE = 2000
+NOTES_IMPORT_BATCH_SIZE = 1000
+
+# Асинхронные версии списка и страницы заметки для запуска под ASGI.
+NOTES_ASYNC_VIEWS = os.environ.get('NOTES_ASYNC_VIEWS') == '1'
+
+# Подсчёт запросов к базе для каждого адреса (см. notes.query_budget).
+QUERY_BUDGET_ENABLED = DEBUG
+# Лимиты включают чтение сессии и пользователя.
+QUERY_BUDGETS = {
+    'notes:list': 4,
+    'notes:detail': 3,
+    'notes:search': 3,
+    'notes:add': 9,
+    'notes:edit': 8,
+    'notes:delete': 4,
+    'notes:success': 2,
+}